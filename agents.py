@@ -7,27 +7,308 @@ Each agent is configured with:
 - goal: The agent's primary objective
 - backstory: Background and expertise
 - tools: Available capabilities (currently GitHub tools via LangChain)
-- llm: Language model for reasoning (configurable via OPENAI_MODEL_NAME)
+- llm: Language model for reasoning (routed per role and task, see routing.py)
 - allow_delegation: Whether the agent can delegate tasks to other agents
 
+Agents are built once per process through the registry (get_agent / get_squad_agents)
+and share pooled LLM clients, so crews and tasks always reference the same instances.
+
 To customize tools, modify the tools parameter or add additional tools from crewai-tools.
 """
 
-from crewai import Agent
-from langchain_openai import ChatOpenAI
+from typing import Any, Callable, Iterable, Optional
+from crewai import Agent, LLM
+from openai import OpenAI
+import crewai.llm
 from tools import github_tools
+from llm_cache import create_cache_middleware, get_default_cache
+from ratelimit import GovernedTransport, llm_rate_limit_middleware
+from tracing import llm_tracing_middleware
+from streaming import current_delta_sink, llm_streaming_middleware
+from routing import get_router, latency_middleware, select_route, set_router
+from contextlib import contextmanager
+import httpx
+import litellm
 import os
+import sys
+import threading
+import warnings
+
+
+# Process-wide caches: one HTTP pool per model, one LLM client per configuration
+# and one agent per role, so running many crews in a worker keeps construction
+# cost and socket count flat.
+_registry_lock = threading.RLock()
+_http_clients: dict[str, httpx.Client] = {}
+_openai_clients: dict[str, OpenAI] = {}
+_llms: dict[tuple, "SquadLLM"] = {}
+_agents: dict[str, Agent] = {}
+_idle_squads: list[dict[str, Agent]] = []
+
+# Middleware applied to every LLM call, outermost first.
+# Signature: middleware(llm, messages, call_next) -> str
+LLMMiddleware = Callable[["SquadLLM", list[dict], Callable[[list[dict]], str]], str]
+_llm_middleware: list[LLMMiddleware] = []
+
+
+def add_llm_middleware(middleware: LLMMiddleware) -> None:
+    """
+    Register a middleware around every agent LLM call (caching, tracing, ...).
+    """
+    if middleware not in _llm_middleware:
+        _llm_middleware.append(middleware)
+
+
+_LITELLM_BANNERS = (
+    "Give Feedback / Get Help: https://github.com/BerriAI/litellm/issues/new",
+    "LiteLLM.Info: If you need to debug this error, use `litellm.set_verbose=True`",
+)
+_banner_lock = threading.Lock()
+_banner_depth = 0
+_saved_streams: tuple = ()
+_saved_warnings: Optional[warnings.catch_warnings] = None
+# Filters are never freed: print() holds only a borrowed reference to sys.stdout,
+# so a filter dropped while another thread prints through it would crash the process
+_filters: dict[int, "_BannerFilter"] = {}
+
+
+class _BannerFilter:
+    """
+    Stream proxy that drops litellm's help banners and forwards everything else.
+    """
+
+    def __init__(self, stream: Any):
+        self._stream = stream
+
+    def write(self, text: str) -> int:
+        if any(banner in text for banner in _LITELLM_BANNERS):
+            return len(text)
+        return self._stream.write(text)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+@contextmanager
+def _filter_litellm_banners():
+    """
+    Thread-safe replacement of crewai.llm.suppress_warnings.
 
+    CrewAI swaps sys.stdout/sys.stderr for a StringIO around every LLM call; with
+    concurrent calls (parallel tasks, batches) a thread can restore another
+    call's StringIO and swallow all later output. Here the filter, and the
+    "ignore" warnings filter crewai sets for litellm and pydantic warnings, are
+    installed by the first call in flight and removed by the last one.
+    """
+    global _banner_depth, _saved_streams, _saved_warnings
+    with _banner_lock:
+        if _banner_depth == 0:
+            # The warnings filters are process-wide too, so they follow the same first-in/last-out rule
+            _saved_warnings = warnings.catch_warnings()
+            _saved_warnings.__enter__()
+            warnings.filterwarnings("ignore")
+            _saved_streams = (sys.stdout, sys.stderr)
+            sys.stdout, sys.stderr = (
+                _filters.setdefault(id(stream), _BannerFilter(stream)) for stream in _saved_streams
+            )
+        _banner_depth += 1
+    try:
+        yield
+    finally:
+        with _banner_lock:
+            _banner_depth -= 1
+            if _banner_depth == 0:
+                sys.stdout, sys.stderr = _saved_streams
+                _saved_warnings.__exit__(None, None, None)
+                _saved_warnings = None
+
+
+crewai.llm.suppress_warnings = _filter_litellm_banners
 
-def get_llm():
+
+class SquadLLM(LLM):
+    """
+    CrewAI LLM tagged with the agent role whose calls run through the LLM middleware.
+    """
+
+    def __init__(self, model: str, role: Optional[str] = None, routed: bool = False, **kwargs: Any):
+        super().__init__(model=model, **kwargs)
+        self.role = role
+        self.routed = routed
+
+    def for_current_call(self) -> "SquadLLM":
+        """
+        The LLM a call should use: this one, or the one its route selects for the
+        current task or while its model is over its latency SLO (see routing.py).
+        """
+        if not self.routed:
+            return self
+        route = select_route(self.role)
+        if (route.model, route.temperature, route.max_tokens, route.timeout) == (
+            self.model, self.temperature, self.max_tokens, self.timeout
+        ):
+            return self
+        return get_llm(route.model, route.temperature, self.role, route.max_tokens, route.timeout)
+
+    def call(self, messages: list[dict], callbacks: list[Any] = []) -> str:
+        llm = self.for_current_call()
+
+        def call_next(index: int, messages: list[dict]) -> str:
+            if index == len(_llm_middleware):
+                on_delta = current_delta_sink()
+                if on_delta is not None:
+                    return llm._stream_call(messages, callbacks, on_delta)
+                return LLM.call(llm, messages, callbacks=callbacks)
+            return _llm_middleware[index](llm, messages, lambda m: call_next(index + 1, m))
+
+        return call_next(0, messages)
+
+    def _stream_call(self, messages: list[dict], callbacks: list[Any], on_delta: Callable[[str], None]) -> str:
+        """
+        Same request as LLM.call, but streamed, passing each content delta to on_delta.
+        """
+        if callbacks:
+            self.set_callbacks(callbacks)
+        params = {
+            "model": self.model,
+            "messages": messages,
+            "timeout": self.timeout,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "n": self.n,
+            "stop": self.stop,
+            "max_tokens": self.max_tokens or self.max_completion_tokens,
+            "presence_penalty": self.presence_penalty,
+            "frequency_penalty": self.frequency_penalty,
+            "logit_bias": self.logit_bias,
+            "response_format": self.response_format,
+            "seed": self.seed,
+            "logprobs": self.logprobs,
+            "top_logprobs": self.top_logprobs,
+            "api_base": self.base_url,
+            "api_version": self.api_version,
+            "api_key": self.api_key,
+            **self.kwargs,
+            "stream": True,
+        }
+        params = {k: v for k, v in params.items() if v is not None}
+
+        parts = []
+        for chunk in litellm.completion(**params):
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                on_delta(delta)
+        return "".join(parts)
+
+
+# Record latency and tokens of every call made during a traced run (see tracing.py)
+add_llm_middleware(llm_tracing_middleware)
+
+# Stream output deltas to stream_it_squad consumers (see streaming.py)
+add_llm_middleware(llm_streaming_middleware)
+
+# Replay completions from disk when LLM_CACHE is enabled (see llm_cache.py)
+llm_cache = get_default_cache()
+if llm_cache is not None:
+    add_llm_middleware(create_cache_middleware(llm_cache))
+
+# Share the OpenAI request budget and retry rate-limited calls across concurrent crews (see ratelimit.py)
+add_llm_middleware(llm_rate_limit_middleware)
+
+# Measure model latency for the routing fallback (see routing.py)
+add_llm_middleware(latency_middleware)
+
+
+def get_http_client(model_name: str) -> httpx.Client:
+    """
+    Get the pooled HTTP client shared by every LLM client of the given model.
+    """
+    with _registry_lock:
+        client = _http_clients.get(model_name)
+        if client is None:
+            # The transport reports rate-limit headers to the shared governor (see ratelimit.py)
+            client = httpx.Client(
+                transport=GovernedTransport(
+                    "openai",
+                    httpx.HTTPTransport(limits=httpx.Limits(max_connections=20, max_keepalive_connections=10))
+                ),
+                timeout=httpx.Timeout(600.0, connect=10.0)
+            )
+            _http_clients[model_name] = client
+        return client
+
+
+def _is_openai_model(model_name: str) -> bool:
+    return "/" not in model_name or model_name.startswith("openai/")
+
+
+def get_openai_client(model_name: str) -> OpenAI:
+    """
+    Get the OpenAI SDK client for a model, backed by its pooled HTTP client.
+    """
+    with _registry_lock:
+        client = _openai_clients.get(model_name)
+        if client is None:
+            client = OpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=os.getenv("OPENAI_API_BASE") or None,
+                http_client=get_http_client(model_name),
+                # Retries are left to the governor, which coordinates them across agents
+                max_retries=0
+            )
+            _openai_clients[model_name] = client
+        return client
+
+
+def get_llm(
+    model_name: Optional[str] = None,
+    temperature: Optional[float] = None,
+    role: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    timeout: Optional[float] = None
+) -> SquadLLM:
     """
     Get the language model for agents.
     
-    The model can be configured via the OPENAI_MODEL_NAME environment variable.
-    Default is gpt-4. For lower costs, consider using gpt-3.5-turbo or gpt-4o-mini.
+    Without a model name, the model, temperature, max tokens and timeout come
+    from the role's route (see routing.py), and each call is re-routed for the
+    task being run and the latency SLO. With a model name, the LLM always uses
+    that model (OPENAI_MODEL_NAME sets the default, gpt-4; for lower costs,
+    consider gpt-3.5-turbo or gpt-4o-mini).
+
+    Returns a CrewAI LLM (CrewAI converts LangChain chat models into one anyway,
+    dropping their HTTP client). Clients are cached per configuration and role,
+    and OpenAI models reuse the pooled SDK client of their model, so repeated
+    calls do not open new connections. The role tags the client for the LLM
+    middleware (e.g. the completion cache in llm_cache.py).
     """
-    model_name = os.getenv("OPENAI_MODEL_NAME", "gpt-4")
-    return ChatOpenAI(model=model_name, temperature=0.7)
+    routed = model_name is None
+    if routed:
+        route = get_router().route(role)
+        model_name = route.model
+        temperature = route.temperature if temperature is None else temperature
+        max_tokens = route.max_tokens if max_tokens is None else max_tokens
+        timeout = route.timeout if timeout is None else timeout
+    temperature = 0.7 if temperature is None else temperature
+    key = (model_name, temperature, role, max_tokens, timeout, routed)
+    with _registry_lock:
+        llm = _llms.get(key)
+        if llm is None:
+            params = {}
+            if _is_openai_model(model_name):
+                params["client"] = get_openai_client(model_name)
+            llm = SquadLLM(
+                model=model_name,
+                role=role,
+                routed=routed,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout,
+                **params
+            )
+            _llms[key] = llm
+        return llm
 
 
 def create_project_manager() -> Agent:
@@ -45,7 +326,7 @@ def create_project_manager() -> Agent:
                   "Você tem expertise em metodologias ágeis e é excelente em comunicação.",
         verbose=True,
         allow_delegation=True,
-        llm=get_llm(),
+        llm=get_llm(role="project_manager"),
         tools=github_tools
     )
 
@@ -65,7 +346,7 @@ def create_tech_lead() -> Agent:
                   "Você é apaixonado por código de qualidade e mentoria de desenvolvedores.",
         verbose=True,
         allow_delegation=True,
-        llm=get_llm(),
+        llm=get_llm(role="tech_lead"),
         tools=github_tools
     )
 
@@ -85,7 +366,7 @@ def create_developer() -> Agent:
                   "tecnologias. Você tem um forte compromisso com a qualidade e a excelência técnica.",
         verbose=True,
         allow_delegation=False,
-        llm=get_llm(),
+        llm=get_llm(role="developer"),
         tools=github_tools
     )
 
@@ -106,6 +387,98 @@ def create_tester() -> Agent:
                   "de alta qualidade.",
         verbose=True,
         allow_delegation=False,
-        llm=get_llm(),
+        llm=get_llm(role="tester"),
         tools=github_tools
     )
+
+
+# Registry of agent factories by role key
+AGENT_FACTORIES = {
+    "project_manager": create_project_manager,
+    "tech_lead": create_tech_lead,
+    "developer": create_developer,
+    "tester": create_tester,
+}
+
+
+def get_agent(role: str) -> Agent:
+    """
+    Get the shared agent for a role, building it on first use.
+    
+    Args:
+        role: Role key from AGENT_FACTORIES (e.g. "tech_lead")
+        
+    Returns:
+        The process-wide Agent instance for that role
+    """
+    if role not in AGENT_FACTORIES:
+        raise ValueError(f"Unknown agent role: {role!r}. Expected one of {list(AGENT_FACTORIES)}")
+    with _registry_lock:
+        agent = _agents.get(role)
+        if agent is None:
+            agent = AGENT_FACTORIES[role]()
+            _agents[role] = agent
+        return agent
+
+
+def get_squad_agents() -> dict[str, Agent]:
+    """
+    Get all squad agents keyed by role, in workflow order.
+    """
+    return {role: get_agent(role) for role in AGENT_FACTORIES}
+
+
+@contextmanager
+def checkout_squad():
+    """
+    Borrow a full set of agents for the exclusive use of one crew run.
+    
+    CrewAI agents keep per-execution state, so crews running concurrently must
+    not share them. Squads are returned to an idle pool after use, so the
+    number ever built equals the peak number of concurrent runs, and all of
+    them share the same LLM clients.
+    
+    Yields:
+        Agents keyed by role
+    """
+    with _registry_lock:
+        squad = _idle_squads.pop() if _idle_squads else None
+    if squad is None:
+        squad = {role: factory() for role, factory in AGENT_FACTORIES.items()}
+    try:
+        yield squad
+    finally:
+        with _registry_lock:
+            _idle_squads.append(squad)
+
+
+def release_run_state(agents: Iterable[Agent]) -> None:
+    """
+    Drop the per-run state CrewAI leaves on agents after a crew run.
+
+    Each agent keeps its last executor (with the full message transcript of its
+    last task), its crew (with every task and output) and a tools_results list
+    that grows with every tool call; on warm agents reused run after run these
+    would keep memory growing.
+    """
+    for agent in agents:
+        agent.tools_results = []
+        agent.agent_executor = None
+        agent.crew = None
+
+
+def reset_registry() -> None:
+    """
+    Drop cached agents and LLM clients and close the pooled HTTP clients.
+    
+    Useful when the environment (model, keys, routes) changes inside a long-lived process.
+    """
+    with _registry_lock:
+        _agents.clear()
+        _idle_squads.clear()
+        _llms.clear()
+        set_router(None)
+        _openai_clients.clear()
+        for client in _http_clients.values():
+            client.close()
+        _http_clients.clear()
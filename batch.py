@@ -0,0 +1,269 @@
+"""
+Batch Runner
+This module runs the IT squad for many project descriptions concurrently.
+
+The input is a JSONL file with one project per line:
+
+    {"id": "blog-01", "project_description": "Criar uma aplicação web de blog..."}
+
+("id" is optional; a hash of the description is used when missing, and an
+optional "repository": "owner/repo" points that project's GitHub tools to
+another repository than GITHUB_REPOSITORY). A project listed twice runs once,
+and two different projects with the same id are rejected. Crews run
+on a thread pool, each with its own set of agents borrowed from
+agents.checkout_squad, while OpenAI and GitHub calls share the global rate
+limits from ratelimit.py (or, with --processes, on worker processes that
+split them; see workers.py). Every finished run is appended to the output JSONL
+right away, and rerunning with the same output file skips the IDs that already
+completed, so a crashed batch resumes where it stopped.
+
+Usage:
+    python batch.py projects.jsonl results.jsonl --concurrency 4 --openai-rpm 60
+    python batch.py projects.jsonl results.jsonl --concurrency 8 --processes 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Iterable, Optional
+
+
+def project_id(item: dict) -> str:
+    """
+    Return the item's ID, or a stable hash of its project description.
+    """
+    if item.get("id"):
+        return str(item["id"])
+    digest = hashlib.sha1(item["project_description"].encode("utf-8")).hexdigest()
+    return digest[:12]
+
+
+def unique_projects(items: Iterable[dict]) -> list[dict]:
+    """
+    Give every project its ID and drop the ones repeating an earlier project.
+
+    A project with the ID, description and repository of an earlier one would
+    only rerun it, so it is dropped; two different projects sharing an ID are
+    rejected, since their results and resume state could not be told apart.
+
+    Raises:
+        ValueError: If two different projects have the same ID
+    """
+    projects: dict[str, dict] = {}
+    repeated = 0
+    for item in items:
+        item = dict(item, id=project_id(item))
+        earlier = projects.get(item["id"])
+        if earlier is None:
+            projects[item["id"]] = item
+        elif (earlier["project_description"], earlier.get("repository")) == (
+            item["project_description"], item.get("repository")
+        ):
+            repeated += 1
+        else:
+            raise ValueError(f"duplicate project id {item['id']!r} for different projects")
+    if repeated:
+        print(f"⚠️  {repeated} projeto(s) repetido(s) ignorado(s)")
+    return list(projects.values())
+
+
+def load_batch(path: str) -> list[dict]:
+    """
+    Read projects from a JSONL file, skipping blank lines and repeated projects.
+
+    Raises:
+        ValueError: If a line is not valid JSON or has no project_description,
+            or two different projects have the same ID
+    """
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({e})") from e
+            if not item.get("project_description"):
+                raise ValueError(f"{path}:{line_number}: missing project_description")
+            items.append(item)
+    try:
+        return unique_projects(items)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from e
+
+
+def completed_ids(output_path: str) -> set[str]:
+    """
+    IDs that already finished successfully in an existing output file.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash; that run will be retried
+                continue
+            if record.get("status") == "ok":
+                done.add(record["id"])
+    return done
+
+
+def serialize_result(result: Any) -> dict:
+    """
+    Convert a crew result into JSON-friendly data.
+    """
+    tasks = [
+        {
+            "name": getattr(output, "name", None),
+            "agent": getattr(output, "agent", None),
+            "output": getattr(output, "raw", str(output)),
+        }
+        for output in getattr(result, "tasks_output", None) or []
+    ]
+    return {"result": getattr(result, "raw", str(result)), "tasks": tasks}
+
+
+def run_project(item: dict, parallel: bool = False, max_task_concurrency: int = 2) -> dict:
+    """
+    Run one project with its own set of agents and return its output record.
+    """
+    from agents import checkout_squad
+    from crew import run_it_squad
+
+    started = time.perf_counter()
+    record: dict[str, Any] = {"id": item["id"]}
+    try:
+        with checkout_squad() as agents:
+            result = run_it_squad(
+                item["project_description"],
+                parallel=parallel,
+                max_concurrency=max_task_concurrency,
+                agents=agents,
+                repository=item.get("repository")
+            )
+        record["status"] = "ok"
+        record.update(serialize_result(result))
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+        record["traceback"] = traceback.format_exc()
+    record["duration_seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def run_batch(
+    items: Iterable[dict],
+    output_path: str,
+    concurrency: int = 4,
+    parallel: bool = False,
+    max_task_concurrency: int = 2,
+    resume: bool = True,
+    processes: int = 1
+) -> dict:
+    """
+    Run many projects concurrently, streaming each result to output_path.
+
+    Args:
+        items: Projects with "project_description" and optional "id"; repeated
+            projects run once (see unique_projects)
+        output_path: JSONL file that receives one record per finished run
+        concurrency: Number of crews running at the same time, over all processes
+        parallel: Use the dependency-graph scheduler inside each crew
+        max_task_concurrency: Task concurrency inside each crew in parallel mode
+        resume: Skip IDs that already succeeded in output_path
+        processes: Worker processes sharing the runs (see workers.py); 1 runs
+            every crew on threads of this process, 0 uses one per CPU
+
+    Returns:
+        Summary with counts of ok, failed and skipped runs
+
+    Raises:
+        ValueError: If two different projects have the same ID
+    """
+    items = unique_projects(items)
+    done = completed_ids(output_path) if resume else set()
+    pending = [item for item in items if item["id"] not in done]
+    summary = {"ok": 0, "error": 0, "skipped": len(items) - len(pending)}
+
+    write_lock = threading.Lock()
+
+    def write(record: dict) -> None:
+        with write_lock:
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            os.fsync(output.fileno())
+        summary[record["status"]] += 1
+        print(f"{'✓' if record['status'] == 'ok' else '✗'} {record['id']} "
+              f"({record['duration_seconds']:.1f}s)")
+
+    with open(output_path, "a", encoding="utf-8") as output:
+        if processes != 1:
+            from workers import WorkerPool, default_processes
+
+            # The crews running at once are spread over the processes
+            processes = processes or default_processes()
+            threads = -(-max(1, concurrency) // processes)
+            with WorkerPool(processes, threads, parallel, max_task_concurrency) as pool:
+                for record in pool.run(pending):
+                    write(record)
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="squad-batch") as pool:
+                futures = [
+                    pool.submit(run_project, item, parallel, max_task_concurrency)
+                    for item in pending
+                ]
+                for future in as_completed(futures):
+                    write(future.result())
+
+    return summary
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run the IT squad for every project in a JSONL file.")
+    parser.add_argument("input", help="JSONL file with one {\"id\", \"project_description\"} per line")
+    parser.add_argument("output", help="JSONL file that receives one result per finished run")
+    parser.add_argument("--concurrency", type=int, default=4, help="crews running at the same time")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="worker processes sharing the runs (default: 1, threads only; 0: one per CPU)")
+    parser.add_argument("--parallel", action="store_true", help="run independent tasks of each crew concurrently")
+    parser.add_argument("--openai-rpm", type=float, help="global OpenAI requests per minute")
+    parser.add_argument("--github-rpm", type=float, help="global GitHub requests per minute")
+    parser.add_argument("--no-resume", action="store_true", help="rerun IDs already present in the output")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    from ratelimit import configure_rate_limit
+    if args.openai_rpm is not None:
+        configure_rate_limit("openai", args.openai_rpm)
+    if args.github_rpm is not None:
+        configure_rate_limit("github", args.github_rpm)
+
+    items = load_batch(args.input)
+    summary = run_batch(
+        items,
+        args.output,
+        concurrency=args.concurrency,
+        parallel=args.parallel,
+        resume=not args.no_resume,
+        processes=args.processes
+    )
+    print(f"\n📦 Batch finalizado: {summary['ok']} ok, {summary['error']} com erro, "
+          f"{summary['skipped']} já concluídos")
+    return 0 if summary["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
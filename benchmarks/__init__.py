@@ -0,0 +1,10 @@
+"""
+Offline benchmarks for the IT squad.
+
+The squad runs against a scripted local LLM and a fake GitHub (see fakes.py),
+so framework overhead can be measured without network access or API spend.
+
+Usage:
+    python -m benchmarks.run                      # writes benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+"""
@@ -0,0 +1,285 @@
+"""
+Fakes
+Deterministic local stand-ins for the LLM API and GitHub used by the benchmarks.
+
+FakeLLM replaces litellm.completion, so the agents' whole LLM path (CrewAI
+executor, SquadLLM middleware, routing) still runs and only the network call is
+replaced. Its responses are scripted: each task first calls a GitHub tool a
+configurable number of times, then returns a final answer of a fixed length;
+speculative drafts are reconciled with a fixed answer (see speculation.py).
+FakeGitHub is installed as the wrapper of the default GitHub tool provider,
+so tool calls go through the tool middleware as in a real run.
+
+FakeGitHubAPI is a local HTTP server for the REST resources github_cache.py
+revalidates: it answers with an ETag per resource and 304 Not Modified until
+the resource is changed.
+
+Both FakeLLM and FakeGitHub can reject every Nth call with a rate-limit error (429 for the LLM,
+a 403 secondary rate limit for GitHub) carrying a Retry-After header, to
+exercise the retry governor in ratelimit.py.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, Optional
+
+
+# First line of every FakeGitHub result; FakeLLM counts it to know which tool calls are done
+RESULT_MARKER = "[fake-github]"
+
+
+class FakeLLM:
+    """
+    Scripted completion function with configurable latency and output size.
+
+    Args:
+        latency_s: Seconds each completion takes
+        completion_tokens: Approximate tokens of each final answer
+        tool_calls_per_task: GitHub tool calls made before answering
+        tool_name: Name of the tool the script calls
+        tool_input: Action Input of the tool calls (JSON of the tool's arguments)
+        model_latency: Per-model latency overriding latency_s (e.g. slow gpt-4, fast gpt-4o-mini)
+        rate_limit_every: Reject every Nth call with a 429 (0 = never)
+        retry_after: Retry-After seconds of the injected 429s
+        reconcile_answer: Answer to speculation reconcile prompts ("MANTER" keeps the draft)
+    """
+
+    def __init__(
+        self,
+        latency_s: float = 0.05,
+        completion_tokens: int = 200,
+        tool_calls_per_task: int = 1,
+        tool_name: str = "Get Issues",
+        tool_input: str = "{}",
+        model_latency: Optional[dict[str, float]] = None,
+        rate_limit_every: int = 0,
+        retry_after: float = 0.05,
+        reconcile_answer: str = "MANTER"
+    ):
+        self.latency_s = latency_s
+        self.completion_tokens = completion_tokens
+        self.tool_calls_per_task = tool_calls_per_task
+        self.tool_name = tool_name
+        self.tool_input = tool_input
+        self.model_latency = model_latency or {}
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.reconcile_answer = reconcile_answer
+        self.rate_limited = 0
+        self.calls = 0
+        self.seconds = 0.0
+        self.calls_by_model: dict[str, int] = {}
+        self.max_prompt_chars = 0
+        self._complete: Optional[Callable] = None
+        self._lock = threading.Lock()
+
+    def respond(self, messages: list[dict]) -> str:
+        from speculation import RECONCILE_PROMPT
+
+        transcript = "\n".join(str(message.get("content", "")) for message in messages)
+        if transcript.startswith(RECONCILE_PROMPT.split("\n", 1)[0]):
+            return self.reconcile_answer
+        if transcript.count(RESULT_MARKER) < self.tool_calls_per_task:
+            return (
+                "Thought: I should check the repository first\n"
+                f"Action: {self.tool_name}\n"
+                f"Action Input: {self.tool_input}"
+            )
+        body = " ".join(f"item{i}" for i in range(self.completion_tokens))
+        return f"Thought: I now can give a great answer\nFinal Answer: {body}"
+
+    def __call__(self, **params):
+        model = params["model"]
+        latency = self.model_latency.get(model, self.latency_s)
+        with self._lock:
+            self.calls += 1
+            self.seconds += latency
+            self.calls_by_model[model] = self.calls_by_model.get(model, 0) + 1
+            prompt_chars = sum(len(str(message.get("content", ""))) for message in params["messages"])
+            self.max_prompt_chars = max(self.max_prompt_chars, prompt_chars)
+            reject = self.rate_limit_every and self.calls % self.rate_limit_every == 0
+            self.rate_limited += int(bool(reject))
+        if reject:
+            import httpx
+            import litellm
+            response = httpx.Response(
+                429,
+                headers={"retry-after": str(self.retry_after)},
+                request=httpx.Request("POST", "http://fake-llm/v1/chat/completions")
+            )
+            raise litellm.RateLimitError("Rate limit reached", llm_provider="openai", model=model, response=response)
+        time.sleep(latency)
+        return self._complete(**params, mock_response=self.respond(params["messages"]))
+
+
+# How GitHubAPIWrapper reports a failure of the operations that do not raise:
+# it catches the exception and returns its message as the result
+WRAPPER_ERRORS = {
+    "read_file": "File not found `{instructions}` on branch`main`. Error: {error}",
+    "list_files_in_main_branch": "{error}",
+    "list_branches_in_repo": "{error}",
+    "list_files_in_bot_branch": "Error: {error}",
+    "get_files_from_directory": "Error: status code {status}, {message}",
+    "comment_on_issue": "Unable to make comment due to error:\n{error}",
+    "create_file": "Unable to make file due to error:\n{error}",
+    "update_file": "Unable to update file due to error:\n{error}",
+    "delete_file": "Unable to delete file due to error:\n{error}",
+    "create_pull_request": "Unable to make pull request due to error:\n{error}",
+    "create_review_request": "Failed to create a review request with error {error}",
+}
+
+
+class FakeGitHub:
+    """
+    Stand-in for GitHubAPIWrapper that answers every operation locally.
+
+    Injected rate limits surface as the real wrapper reports them: raised for
+    most reads, returned as an error message by the operations in WRAPPER_ERRORS.
+    """
+
+    active_branch = "main"
+
+    def __init__(
+        self,
+        latency_s: float = 0.02,
+        response_bytes: int = 2000,
+        rate_limit_every: int = 0,
+        retry_after: float = 0.05
+    ):
+        self.latency_s = latency_s
+        self.response_bytes = response_bytes
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.rate_limited = 0
+        self.calls = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def run(self, mode: str, instructions: str) -> str:
+        with self._lock:
+            self.calls += 1
+            self.seconds += self.latency_s
+            reject = self.rate_limit_every and self.calls % self.rate_limit_every == 0
+            self.rate_limited += int(bool(reject))
+        if reject:
+            from github import RateLimitExceededException
+            error = RateLimitExceededException(
+                403,
+                {"message": "You have exceeded a secondary rate limit"},
+                {"retry-after": str(self.retry_after)}
+            )
+            if mode in WRAPPER_ERRORS:
+                return WRAPPER_ERRORS[mode].format(
+                    instructions=instructions, error=error, status=error.status, message=error.message
+                )
+            raise error
+        time.sleep(self.latency_s)
+        lines = [RESULT_MARKER]
+        size = len(RESULT_MARKER)
+        number = 1
+        while size < self.response_bytes:
+            line = f"#{number} {mode}: fake entry for benchmark runs"
+            lines.append(line)
+            size += len(line) + 1
+            number += 1
+        return "\n".join(lines)
+
+
+class FakeGitHubAPI:
+    """
+    Local GitHub REST API serving versioned resources with ETags and 304 responses.
+
+    Usage:
+        with FakeGitHubAPI() as api:
+            requester = Github(base_url=api.url, auth=Auth.Token("bench")).requester
+            api.change("/repos/bench/squad/commits/main")
+    """
+
+    def __init__(self):
+        self.versions: dict[str, int] = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.url = ""
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def change(self, path: str) -> None:
+        """
+        Give a resource (path with query) a new version, hence a new ETag.
+        """
+        with self._lock:
+            self.versions[path] = self.versions.get(path, 0) + 1
+
+    def _respond(self, handler: BaseHTTPRequestHandler) -> None:
+        with self._lock:
+            self.requests += 1
+            etag = f'W/"{self.versions.get(handler.path, 0)}"'
+            not_modified = handler.headers.get("If-None-Match") == etag
+            self.not_modified += int(not_modified)
+        handler.send_response(304 if not_modified else 200)
+        handler.send_header("ETag", etag)
+        handler.send_header("Content-Length", "0" if not_modified else "2")
+        handler.end_headers()
+        if not not_modified:
+            handler.wfile.write(b"{}")
+
+    def __enter__(self) -> "FakeGitHubAPI":
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                api._respond(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@contextmanager
+def install_fakes(llm: FakeLLM, github: FakeGitHub, repository: str = "bench/squad") -> Iterator[None]:
+    """
+    Route LLM completions to llm and GitHub tool calls to github inside the block.
+
+    The agent registry is reset on entry and exit, so agents are rebuilt with the fake tools.
+    """
+    import litellm
+    import agents
+    import tools
+
+    original_completion = litellm.completion
+    original_tools = list(tools.github_tools)
+    default_key = (os.getenv("GITHUB_TOKEN"), os.getenv("GITHUB_REPOSITORY"))
+    original_provider = tools._providers.get(default_key)
+
+    original_build = tools.GitHubToolProvider._build_wrapper
+    # Every repository (run_it_squad(repository=...)) is served by the same fake
+    tools.GitHubToolProvider._build_wrapper = lambda provider: github
+    provider = tools.GitHubToolProvider(token="fake", repository=repository)
+    llm._complete = original_completion
+    litellm.completion = llm
+    tools._providers[default_key] = provider
+    # In place: agents.py holds a reference to this same list
+    tools.github_tools[:] = tools.get_github_tools(provider)
+    agents.reset_registry()
+    try:
+        yield
+    finally:
+        litellm.completion = original_completion
+        tools.GitHubToolProvider._build_wrapper = original_build
+        tools.github_tools[:] = original_tools
+        if original_provider is None:
+            tools._providers.pop(default_key, None)
+        else:
+            tools._providers[default_key] = original_provider
+        agents.reset_registry()
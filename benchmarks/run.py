@@ -0,0 +1,507 @@
+"""
+Benchmark Runner
+Measures the squad's framework overhead offline and writes the results to a baseline JSON.
+
+Scenarios:
+- startup: `python -X importtime` cumulative import time of main and crew, and
+  the wall time of `python main.py --help`
+- prompts: tokens of the static prompt components with compaction off and on (see prompts.py)
+- construction: building a crew with a cold and a warm agent registry
+- task overhead: wall time per task not spent in the fake LLM or GitHub
+- throughput: N concurrent run_it_squad calls through the batch runner
+- processes: the same runs with near-zero fake latency, on threads of one
+  process and on worker processes (see workers.py)
+- memory: peak traced memory of the concurrent runs (tracemalloc)
+- rate limits: the concurrent runs again with the fakes rejecting every Nth
+  call, retried by the governor in ratelimit.py; the agents read files, whose
+  rate limits the GitHub wrapper returns as error results instead of raising
+- github cache: repeated file reads through the response cache with every
+  read revalidated against a local fake REST API, a change halfway through
+  that must not be served stale, and a wrapper error that must not be cached
+- memory index: median recall latency over an index of past runs (see memory.py)
+- large results: largest prompt sent to the LLM when GitHub returns a very
+  large result, which tools.py pages to a token budget
+- speculation: end-to-end time of a sequential run with and without the
+  testing draft running alongside the implementation (see speculation.py)
+- routing: end-to-end time with one model for every role, per-role routes,
+  and per-role routes with a latency SLO fallback (see routing.py)
+- result store: memory released by dropping retained run results, returned as
+  CrewOutput and as spilled RunResult handles (see results.py)
+
+Usage:
+    python -m benchmarks.run --output benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --tolerance 0.2
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from unittest import mock
+from typing import Callable, Iterator, Optional
+
+# Prefixes of the metrics where a larger value is an improvement; every other metric is a cost
+HIGHER_IS_BETTER = ("throughput_runs_per_min", "cpu_throughput_")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROJECT_DESCRIPTION = (
+    "Desenvolver uma API REST de gerenciamento de tarefas em Python com FastAPI, "
+    "SQLite, autenticação básica, testes automatizados e documentação."
+)
+
+
+def configure_environment() -> None:
+    """
+    Pin the settings that affect the measurements, before the squad modules are imported.
+    """
+    os.environ.update({
+        "OPENAI_MODEL_NAME": "gpt-4",
+        "OPENAI_FAST_MODEL_NAME": "gpt-4o-mini",
+        "LLM_CACHE": "off",
+        "GITHUB_CACHE_TTL": "0",
+        "OPENAI_RPM": "0",
+        "GITHUB_RPM": "0",
+        "OTEL_SDK_DISABLED": "true",
+        "CREWAI_TELEMETRY_OPT_OUT": "1",
+    })
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ["CHECKPOINT_DIR"] = tempfile.mkdtemp(prefix="squad-benchmark-checkpoints-")
+    os.environ["RESULT_STORE_DIR"] = tempfile.mkdtemp(prefix="squad-benchmark-results-")
+    os.environ.pop("TRACE_PATH", None)
+    os.environ.pop("MODEL_ROUTES", None)
+
+
+@contextlib.contextmanager
+def quiet() -> Iterator[None]:
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _median_ms(function: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def import_time_ms(module: str) -> float:
+    """
+    Cumulative import time of a module in a fresh interpreter, from `python -X importtime`.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    for line in reversed(completed.stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def bench_startup(repeat: int) -> dict:
+    def help_run():
+        subprocess.run([sys.executable, "main.py", "--help"], cwd=REPO_ROOT, capture_output=True, check=True)
+
+    return {
+        "import_main_ms": statistics.median(import_time_ms("main") for _ in range(repeat)),
+        "import_crew_ms": statistics.median(import_time_ms("crew") for _ in range(repeat)),
+        "startup_help_ms": _median_ms(help_run, repeat),
+    }
+
+
+def bench_prompts() -> dict:
+    from prompts import prompt_report
+
+    rows = prompt_report(PROJECT_DESCRIPTION)
+    return {
+        "prompt_tokens_uncompacted": sum(row["before"] for row in rows),
+        "prompt_tokens": sum(row["after"] for row in rows),
+    }
+
+
+def bench_construction(repeat: int) -> dict:
+    from agents import reset_registry
+    from crew import create_it_squad_crew
+
+    def cold():
+        reset_registry()
+        create_it_squad_crew(PROJECT_DESCRIPTION)
+
+    create_it_squad_crew(PROJECT_DESCRIPTION)
+    return {
+        "construction_cold_ms": _median_ms(cold, repeat),
+        "construction_warm_ms": _median_ms(lambda: create_it_squad_crew(PROJECT_DESCRIPTION), repeat),
+    }
+
+
+def bench_task_overhead(repeat: int, llm, github) -> dict:
+    from crew import run_it_squad
+
+    samples = []
+    for _ in range(repeat):
+        llm_seconds, github_seconds = llm.seconds, github.seconds
+        started = time.perf_counter()
+        result = run_it_squad(PROJECT_DESCRIPTION)
+        wall = time.perf_counter() - started
+        simulated = (llm.seconds - llm_seconds) + (github.seconds - github_seconds)
+        samples.append((wall - simulated) * 1000 / len(result.tasks_output))
+    return {"task_overhead_ms": statistics.median(samples)}
+
+
+def bench_throughput(runs: int, concurrency: int) -> dict:
+    from batch import run_batch
+
+    items = [{"id": f"bench-{i}", "project_description": PROJECT_DESCRIPTION} for i in range(runs)]
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        output_path = os.path.join(directory, "results.jsonl")
+        summary = run_batch(items, output_path, concurrency=concurrency, resume=False)
+        wall = time.perf_counter() - started
+        if summary["error"]:
+            with open(output_path, encoding="utf-8") as f:
+                errors = [record["error"] for record in map(json.loads, f) if record["status"] != "ok"]
+            raise RuntimeError(f"{summary['error']} benchmark runs failed, first: {errors[0]}")
+    return {"batch_wall_s": wall, "throughput_runs_per_min": runs * 60 / wall}
+
+
+def bench_processes(runs: int, concurrency: int, processes: int) -> dict:
+    """
+    CPU-bound batch throughput (fakes answering instantly) with one process and with worker processes.
+
+    The worker count is recorded in the report parameters rather than in the
+    metric name, so baselines from machines with other core counts compare.
+    Workers are forked, so they inherit the fakes installed by the caller.
+    """
+    from batch import run_batch
+
+    results = {}
+    with mock.patch.dict(os.environ, {"WORKER_START_METHOD": "fork"}):
+        for name, count in (("cpu_throughput_1_process", 1), ("cpu_throughput_n_processes", processes)):
+            items = [{"id": f"{name}-{i}", "project_description": PROJECT_DESCRIPTION} for i in range(runs)]
+            with tempfile.TemporaryDirectory() as directory:
+                started = time.perf_counter()
+                summary = run_batch(items, os.path.join(directory, "results.jsonl"),
+                                    concurrency=concurrency, resume=False, processes=count)
+                wall = time.perf_counter() - started
+            if summary["error"]:
+                raise RuntimeError(f"{summary['error']} benchmark runs failed with {count} processes")
+            results[name] = runs * 60 / wall
+    return results
+
+
+def bench_memory(runs: int, concurrency: int) -> dict:
+    from batch import run_batch
+
+    items = [{"id": f"memory-{i}", "project_description": PROJECT_DESCRIPTION} for i in range(runs)]
+    with tempfile.TemporaryDirectory() as directory:
+        tracemalloc.start()
+        try:
+            run_batch(items, os.path.join(directory, "results.jsonl"), concurrency=concurrency, resume=False)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {"peak_memory_mb": peak / (1024 * 1024)}
+
+
+def bench_rate_limited(runs: int, concurrency: int, every: int, llm_latency: float, github_latency: float) -> dict:
+    """
+    Concurrent runs against fakes that inject rate-limit errors; every run must still succeed.
+    """
+    from benchmarks.fakes import FakeGitHub, FakeLLM, install_fakes
+    from ratelimit import get_governor
+
+    llm = FakeLLM(latency_s=llm_latency, rate_limit_every=every, tool_name="Read File",
+                  tool_input='{"formatted_filepath": "README.md"}')
+    github = FakeGitHub(latency_s=github_latency, rate_limit_every=every)
+    governors = [get_governor("openai"), get_governor("github")]
+    retries_before = sum(governor.retries for governor in governors)
+    with install_fakes(llm, github):
+        result = bench_throughput(runs, concurrency)
+    return {
+        "rate_limited_batch_wall_s": result["batch_wall_s"],
+        "rate_limited_retries": sum(governor.retries for governor in governors) - retries_before,
+    }
+
+
+def bench_github_cache(reads: int) -> dict:
+    """
+    Wrapper calls and latency of reads served by github_cache.py, revalidated on every read.
+    """
+    from types import SimpleNamespace
+    from github import Auth, Github
+    from benchmarks.fakes import RESULT_MARKER, FakeGitHubAPI
+    from github_cache import GitHubResponseCache, ResourceValidator, create_cache_middleware
+
+    state = {"content": "v1", "calls": 0}
+
+    def read(mode: str, instructions: str) -> str:
+        state["calls"] += 1
+        return f"{RESULT_MARKER} {state['content']}"
+
+    with FakeGitHubAPI() as api:
+        # Revalidation goes through the wrapper's PyGithub client, here pointed at the fake API
+        # and without PyGithub's spacing between requests, which would dominate the timing
+        client = Github(base_url=api.url, auth=Auth.Token("bench"), seconds_between_requests=0)
+        wrapper = SimpleNamespace(active_branch="main", github_repo_instance=SimpleNamespace(requester=client.requester))
+        provider = SimpleNamespace(repository="bench/squad", resolve=lambda: wrapper)
+        # TTL 0: every read after the first is revalidated against the fake API
+        validator = ResourceValidator(min_interval=0.0)
+        middleware = create_cache_middleware(GitHubResponseCache(ttl=0.0, validator=validator))
+        samples = []
+        for number in range(reads):
+            if number == reads // 2:
+                state["content"] = "v2"
+                api.change("/repos/bench/squad/commits/main")
+            started = time.perf_counter()
+            result = middleware(provider, "read_file", "README.md", read)
+            samples.append((time.perf_counter() - started) * 1000)
+            if not result.endswith(state["content"]):
+                raise RuntimeError(f"GitHub cache served a stale read: {result!r}")
+
+        error = 'File not found `README.md` on branch`main`. Error: 403 {"message": "API rate limit exceeded"}'
+        errors = []
+        for _ in range(2):
+            middleware(provider, "read_file", "docs.md", lambda mode, instructions: errors.append(1) or error)
+        if len(errors) != 2:
+            raise RuntimeError("GitHub cache stored a wrapper error")
+    return {"github_cache_wrapper_calls": state["calls"], "github_cache_read_ms": statistics.median(samples)}
+
+
+def bench_memory_index(indexed_runs: int, repeat: int) -> dict:
+    """
+    Recall latency of the memory index once it holds indexed_runs past runs.
+    """
+    from memory import MemoryIndex
+
+    topics = ("api rest fastapi django flask sqlite postgres react blog loja autenticação jwt docker "
+              "kubernetes fila redis cache pagamentos chat websocket mobile relatório dashboard").split()
+    with tempfile.TemporaryDirectory() as directory:
+        index = MemoryIndex(os.path.join(directory, "memory.sqlite"))
+        for number in range(indexed_runs):
+            project = " ".join(topics[(number * step) % len(topics)] for step in (1, 3, 7, 11)) + f" projeto {number}"
+            index.add(f"run-{number}", project, {
+                task: ("Tech Lead", f"{task}: {project} " * 40) for task in ("planning", "architecture", "testing")
+            })
+        recall_ms = _median_ms(lambda: index.search(PROJECT_DESCRIPTION, task="architecture", k=2), max(repeat, 20))
+        index.close()
+    return {"memory_index_recall_ms": recall_ms}
+
+
+def bench_large_results(response_bytes: int, llm_latency: float, github_latency: float) -> dict:
+    """
+    One sequential run against a GitHub fake returning response_bytes per call.
+    """
+    from benchmarks.fakes import FakeGitHub, FakeLLM, install_fakes
+    from crew import run_it_squad
+
+    llm = FakeLLM(latency_s=llm_latency)
+    github = FakeGitHub(latency_s=github_latency, response_bytes=response_bytes)
+    with install_fakes(llm, github):
+        run_it_squad(PROJECT_DESCRIPTION)
+    # Approximate tokens, as context.count_tokens does without tiktoken
+    return {"large_result_max_prompt_tokens": llm.max_prompt_chars / 4}
+
+
+def bench_speculation(llm_latency: float, github) -> dict:
+    """
+    End-to-end time of one sequential run, without and with speculative testing.
+    """
+    from benchmarks.fakes import FakeLLM, install_fakes
+    from crew import run_it_squad
+
+    results = {}
+    for name, speculative in (("speculation_off_s", False), ("speculation_on_s", True)):
+        with install_fakes(FakeLLM(latency_s=llm_latency), github):
+            started = time.perf_counter()
+            run_it_squad(PROJECT_DESCRIPTION, speculative=speculative)
+            results[name] = time.perf_counter() - started
+    return results
+
+
+def bench_routing(slow_latency: float, fast_latency: float, github) -> dict:
+    """
+    End-to-end time of one sequential run under three routing configurations.
+    """
+    from agents import reset_registry
+    from benchmarks.fakes import FakeLLM, install_fakes
+    from crew import run_it_squad
+    from routing import ModelRoute, ModelRouter, default_routes, set_router
+
+    routes = default_routes()
+    configurations = {
+        "routing_single_model_s": {role: ModelRoute(model="gpt-4") for role in routes},
+        "routing_per_role_s": {role: replace(route, latency_slo_s=None) for role, route in routes.items()},
+        "routing_slo_fallback_s": {
+            role: replace(route, fallback_model="gpt-4o-mini", latency_slo_s=(slow_latency + fast_latency) / 2)
+            for role, route in routes.items()
+        },
+    }
+    results = {}
+    for name, roles in configurations.items():
+        llm = FakeLLM(model_latency={"gpt-4": slow_latency, "gpt-4o-mini": fast_latency}, latency_s=slow_latency)
+        with install_fakes(llm, github):
+            reset_registry()
+            set_router(ModelRouter(roles=roles))
+            try:
+                started = time.perf_counter()
+                run_it_squad(PROJECT_DESCRIPTION)
+                results[name] = time.perf_counter() - started
+            finally:
+                set_router(None)
+    return results
+
+
+def bench_result_store(runs: int, spill_bytes: int, github) -> dict:
+    """
+    Memory held by runs sequential run results kept alive, with the result store off and on.
+    """
+    from benchmarks.fakes import FakeLLM, install_fakes
+    from crew import run_it_squad
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, install_fakes(FakeLLM(latency_s=0.0), github):
+        for name, store in (("result_retained_kb_off", "off"), ("result_retained_kb_on", "on")):
+            environment = {"RESULT_STORE": store, "RESULT_STORE_DIR": directory, "RESULT_SPILL_BYTES": str(spill_bytes)}
+            with mock.patch.dict(os.environ, environment):
+                tracemalloc.start()
+                try:
+                    retained = [run_it_squad(PROJECT_DESCRIPTION) for _ in range(runs)]
+                    gc.collect()
+                    before, _ = tracemalloc.get_traced_memory()
+                    del retained
+                    gc.collect()
+                    after, _ = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+            results[name] = (before - after) / 1024 / runs
+    return results
+
+
+def run_benchmarks(args: argparse.Namespace) -> dict:
+    from benchmarks.fakes import FakeGitHub, FakeLLM, install_fakes
+
+    llm = FakeLLM(latency_s=args.llm_latency, completion_tokens=args.completion_tokens)
+    github = FakeGitHub(latency_s=args.github_latency)
+    results: dict[str, float] = bench_startup(args.repeat)
+    with quiet():
+        with install_fakes(llm, github):
+            results.update(bench_prompts())
+            results.update(bench_construction(args.repeat))
+            results.update(bench_task_overhead(args.repeat, llm, github))
+            results.update(bench_throughput(args.runs, args.concurrency))
+            results.update(bench_memory(args.runs, args.concurrency))
+        with install_fakes(FakeLLM(latency_s=0.0, completion_tokens=args.completion_tokens), FakeGitHub(latency_s=0.0)):
+            results.update(bench_processes(args.runs, args.concurrency, args.processes))
+        results.update(bench_rate_limited(
+            args.runs, args.concurrency, args.rate_limit_every, args.llm_latency, args.github_latency
+        ))
+        results.update(bench_github_cache(max(args.repeat, 20)))
+        results.update(bench_memory_index(args.indexed_runs, args.repeat))
+        results.update(bench_large_results(args.large_result_bytes, args.llm_latency, args.github_latency))
+        results.update(bench_speculation(args.slow_latency, github))
+        results.update(bench_routing(args.slow_latency, args.llm_latency, github))
+        results.update(bench_result_store(args.repeat, args.spill_bytes, github))
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {
+                key: value for key, value in vars(args).items() if key not in ("output", "compare", "tolerance")
+            },
+        },
+        "results": {name: round(value, 3) for name, value in results.items()},
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Metrics that got worse than the baseline by more than tolerance (a fraction).
+    """
+    regressions = []
+    for name, value in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        change = (value - reference) / reference
+        worse = -change if name.startswith(HIGHER_IS_BETTER) else change
+        if worse > tolerance:
+            regressions.append(f"{name}: {reference} -> {value} ({change:+.0%})")
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the IT squad.")
+    parser.add_argument("--output", default=os.path.join("benchmarks", "baseline.json"),
+                        help="JSON file that receives the results (default: benchmarks/baseline.json)")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="compare with a previous results file instead of overwriting it")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="relative slowdown reported as a regression (default: 0.2)")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions of the single-run scenarios")
+    parser.add_argument("--runs", type=int, default=8, help="runs in the throughput scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent runs in the throughput scenario")
+    parser.add_argument("--processes", type=int, default=max(2, os.cpu_count() or 1),
+                        help="worker processes in the processes scenario (default: CPU count, at least 2)")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per fake completion")
+    parser.add_argument("--slow-latency", type=float, default=0.2,
+                        help="seconds per fake completion of the slow model in the routing scenario")
+    parser.add_argument("--github-latency", type=float, default=0.02, help="seconds per fake GitHub call")
+    parser.add_argument("--rate-limit-every", type=int, default=5,
+                        help="fake calls between injected rate-limit errors in the rate-limit scenario")
+    parser.add_argument("--indexed-runs", type=int, default=2000,
+                        help="past runs in the memory index of the memory-index scenario")
+    parser.add_argument("--large-result-bytes", type=int, default=500_000,
+                        help="bytes per fake GitHub result in the large-results scenario")
+    parser.add_argument("--spill-bytes", type=int, default=1024,
+                        help="RESULT_SPILL_BYTES of the result-store scenario (fake answers are small)")
+    parser.add_argument("--completion-tokens", type=int, default=200, help="tokens per fake final answer")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    configure_environment()
+    report = run_benchmarks(args)
+
+    for name, value in report["results"].items():
+        print(f"{name:<28}{value:>12}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        baseline = previous["results"]
+        processes = previous.get("meta", {}).get("parameters", {}).get("processes")
+        if processes is not None and processes != args.processes:
+            print(f"\n⚠️  Linha de base medida com {processes} processos, esta execução com {args.processes}")
+        regressions = compare(report["results"], baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Regressões:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\n✅ Sem regressões")
+        return 0
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    print(f"\n📊 Resultados salvos em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
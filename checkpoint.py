@@ -0,0 +1,194 @@
+"""
+Checkpoints
+This module persists completed task outputs so a failed run can be resumed.
+
+Every task that finishes during run_it_squad is written to a checkpoint file
+together with the GitHub write operations it performed (its side effects).
+Checkpoints are keyed by a hash of the project description and the task
+definitions (description, expected output, agent), so editing a task in
+tasks.py starts a fresh checkpoint instead of reusing stale outputs.
+
+With resume=True, tasks found in the checkpoint are not executed again: their
+saved outputs are fed to the tasks that consume them, and their side effects,
+which already happened, are not repeated but reported. A retry after a failure
+reruns only the tasks that did not finish. The checkpoint file is removed once
+every task of the run has finished, so only failed runs leave one behind.
+
+Inside defer_side_effects() write operations are held back instead of sent,
+for work whose outcome may still be discarded (see speculation.py).
+
+Configuration (environment):
+- CHECKPOINT_DIR: directory of the checkpoint files (default .cache/checkpoints)
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Iterable, Iterator, Optional
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+from github_cache import READ_MODES, wrapper_error
+
+_current_side_effects: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar(
+    "current_side_effects", default=None
+)
+_deferred_side_effects: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar(
+    "deferred_side_effects", default=None
+)
+
+DEFERRED_RESULT = "Operação adiada: será executada somente se este resultado for confirmado."
+
+
+def run_key(project_description: str, tasks: Iterable[Task], repository: Optional[str] = None) -> str:
+    """
+    Hash identifying a run: the project description, the target repository
+    (if not the default one) and every task definition.
+    """
+    digest = hashlib.sha256(project_description.encode("utf-8"))
+    if repository:
+        digest.update(b"\x01" + repository.encode("utf-8"))
+    for task in tasks:
+        role = getattr(task.agent, "role", "") if task.agent else ""
+        for part in (task.name or "", task.description, task.expected_output, role):
+            digest.update(b"\x00" + part.encode("utf-8"))
+    return digest.hexdigest()[:24]
+
+
+class CheckpointStore:
+    """
+    Completed task outputs of one run, saved as a JSON file after every task.
+    """
+
+    def __init__(self, key: str, directory: Optional[str] = None):
+        self.key = key
+        self.directory = directory or os.getenv("CHECKPOINT_DIR", os.path.join(".cache", "checkpoints"))
+        self.path = os.path.join(self.directory, f"{key}.json")
+        self._lock = threading.Lock()
+        self._tasks: dict[str, dict] = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self._tasks = json.load(f).get("tasks", {})
+
+    def completed(self) -> list[str]:
+        return list(self._tasks)
+
+    def load(self, task: Task) -> Optional[TaskOutput]:
+        """
+        Saved output of a task, or None if it has not completed.
+        """
+        record = self._tasks.get(task.name)
+        if record is None:
+            return None
+        return TaskOutput(
+            name=task.name,
+            description=task.description,
+            expected_output=task.expected_output,
+            raw=record["output"],
+            agent=record["agent"],
+        )
+
+    def save(self, task: Task, output: TaskOutput, side_effects: Optional[list[dict]] = None) -> None:
+        """
+        Record a completed task and rewrite the checkpoint file atomically.
+        """
+        with self._lock:
+            self._tasks[task.name] = {
+                "output": output.raw,
+                "agent": output.agent,
+                "completed_at": time.time(),
+                "side_effects": side_effects or [],
+            }
+            os.makedirs(self.directory, exist_ok=True)
+            # A unique temporary file: concurrent runs of the same project share the checkpoint path
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, prefix=f"{self.key}.", suffix=".tmp")
+            with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+                json.dump({"key": self.key, "tasks": self._tasks}, f, ensure_ascii=False, indent=2)
+            os.replace(temporary, self.path)
+
+    def side_effects(self, name: str) -> list[dict]:
+        """
+        GitHub write operations a completed task performed (mode, instructions, repository, result).
+        """
+        return self._tasks.get(name, {}).get("side_effects", [])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tasks.clear()
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def record_side_effects() -> list:
+    """
+    Start collecting the GitHub write operations made in the current context.
+
+    Returns:
+        The list that receives them
+    """
+    side_effects: list[dict] = []
+    _current_side_effects.set(side_effects)
+    return side_effects
+
+
+@contextlib.contextmanager
+def defer_side_effects() -> Iterator[list]:
+    """
+    Hold back the GitHub write operations made in the current context.
+
+    Writes are not sent while the context is open; the agent receives
+    DEFERRED_RESULT instead. Yields the list of held (provider, mode,
+    instructions), to be sent later with replay_side_effects() or dropped.
+    """
+    deferred: list = []
+    token = _deferred_side_effects.set(deferred)
+    try:
+        yield deferred
+    finally:
+        _deferred_side_effects.reset(token)
+
+
+def replay_side_effects(deferred: list) -> list[tuple[str, str]]:
+    """
+    Send held write operations, recorded as side effects of the current context.
+
+    Returns:
+        (mode, error) of the operations that failed
+    """
+    failed = []
+    for provider, mode, instructions in deferred:
+        try:
+            result = provider.invoke(mode, instructions)
+        except Exception as e:
+            failed.append((mode, f"{type(e).__name__}: {e}"))
+            continue
+        if wrapper_error(mode, result):
+            failed.append((mode, result))
+    return failed
+
+
+def side_effects_middleware(provider, mode: str, instructions: str, call_next) -> str:
+    """
+    tools.py middleware that records GitHub write operations for the task's
+    checkpoint, or holds them back inside defer_side_effects().
+    """
+    deferred = _deferred_side_effects.get()
+    if deferred is not None and mode not in READ_MODES:
+        deferred.append((provider, mode, instructions))
+        return DEFERRED_RESULT
+    result = call_next(mode, instructions)
+    side_effects = _current_side_effects.get()
+    if side_effects is not None and mode not in READ_MODES:
+        side_effects.append({
+            "mode": mode,
+            "instructions": instructions,
+            "repository": provider.repository,
+            "result": result[:500],
+        })
+    return result
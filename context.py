@@ -0,0 +1,138 @@
+"""
+Task Context
+This module passes upstream task outputs to downstream tasks within a token budget.
+
+Each task receives the outputs of the tasks it consumes (tasks.TASK_DEPENDENCIES)
+as its context. Outputs that do not fit the budget are compressed extractively:
+headings and list items are kept first, then the opening sentence of each
+paragraph, in their original order. Token counts per task are recorded so the
+savings can be checked at the end of a run.
+
+Configuration (environment):
+- CONTEXT_TOKEN_BUDGET: maximum context tokens per task (default 2000)
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+from scheduler import CONTEXT_SEPARATOR
+
+TRUNCATION_MARKER = "[...]"
+
+_STRUCTURAL_LINE = re.compile(r"^\s*(#{1,6}\s|[-*•]\s|\d+[.)]\s|\*\*[^*]+\*\*)")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens with tiktoken when available, otherwise estimate (~4 chars per token).
+    """
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _first_sentence(line: str) -> str:
+    match = re.match(r"(.+?[.!?])(\s|$)", line)
+    return match.group(1) if match else line
+
+
+def summarize_to_budget(text: str, max_tokens: int) -> str:
+    """
+    Compress text extractively so it fits in max_tokens.
+
+    Args:
+        text: Upstream task output
+        max_tokens: Token budget for the result
+
+    Returns:
+        The text unchanged if it fits, otherwise its most structural lines
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+    # Priority 0: headings and list items; priority 1: first sentence of other lines
+    candidates = []
+    for index, line in enumerate(lines):
+        if _STRUCTURAL_LINE.match(line):
+            candidates.append((0, index, line))
+        else:
+            candidates.append((1, index, _first_sentence(line)))
+
+    budget = max_tokens - count_tokens(TRUNCATION_MARKER)
+    selected: dict[int, str] = {}
+    used = 0
+    for _, index, line in sorted(candidates):
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            continue
+        selected[index] = line
+        used += cost
+
+    summary = "\n".join(selected[index] for index in sorted(selected))
+    return f"{summary}\n{TRUNCATION_MARKER}" if summary else TRUNCATION_MARKER
+
+
+@dataclass
+class TaskContextStats:
+    task: str
+    description_tokens: int
+    context_tokens_raw: int
+    context_tokens: int
+
+
+class ContextBudget:
+    """
+    Builds budgeted task contexts (a scheduler context_builder) and records token counts.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None):
+        self.max_tokens = max_tokens if max_tokens is not None else int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000"))
+        self.stats: dict[str, TaskContextStats] = {}
+        self._lock = threading.Lock()
+
+    def build(self, node, outputs: dict) -> str:
+        """
+        Summarize each dependency's output into an equal share of the budget.
+        """
+        raw_outputs = [outputs[dependency].raw for dependency in node.depends_on]
+        share = self.max_tokens // len(raw_outputs) if raw_outputs else 0
+        context = CONTEXT_SEPARATOR.join(summarize_to_budget(raw, share) for raw in raw_outputs)
+        stats = TaskContextStats(
+            task=node.name,
+            description_tokens=count_tokens(node.task.description),
+            context_tokens_raw=sum(count_tokens(raw) for raw in raw_outputs),
+            context_tokens=count_tokens(context),
+        )
+        with self._lock:
+            self.stats[node.name] = stats
+        return context
+
+    def format_report(self) -> str:
+        """
+        Table of prompt token counts per task (description + context).
+        """
+        rows = [f"{'Tarefa':<16}{'Descrição':>11}{'Contexto bruto':>16}{'Contexto':>10}{'Total':>8}"]
+        for stats in self.stats.values():
+            rows.append(
+                f"{stats.task:<16}{stats.description_tokens:>11}{stats.context_tokens_raw:>16}"
+                f"{stats.context_tokens:>10}{stats.description_tokens + stats.context_tokens:>8}"
+            )
+        return "\n".join(rows)
@@ -3,72 +3,286 @@ IT Squad Crew
 This module brings together all agents and tasks to create the IT squad crew.
 """
 
-from crewai import Crew, Process
-from agents import (
-    create_project_manager,
-    create_tech_lead,
-    create_developer,
-    create_tester
-)
-from tasks import create_all_tasks
+from functools import partial
+from typing import Callable, Optional
+from crewai import Agent, Crew, Process
+from crewai.crews.crew_output import CrewOutput
+from agents import get_squad_agents, release_run_state
+from tasks import TASK_DEPENDENCIES, create_all_tasks, sequential_dependencies
+from tools import repository_scope, warm_github_tools
+from scheduler import TaskNode, execute_node, nodes_from_tasks, run_task_graph_sync
+from context import ContextBudget
+from tracing import task_scope, trace_run
+from streaming import emit
+from checkpoint import CheckpointStore, record_side_effects, run_key
+from delegation import DelegationController
+from speculation import Speculation, speculative_dependencies
+from memory import get_default_memory, with_memory
+from results import get_default_store
 
 
-def create_it_squad_crew(project_description: str) -> Crew:
+def create_it_squad_crew(project_description: str, agents: Optional[dict[str, Agent]] = None) -> Crew:
     """
     Creates and configures the IT squad crew.
     
     Args:
         project_description: Description of the project to be executed by the squad
+        agents: Agents keyed by role (e.g. from agents.checkout_squad); defaults to the shared registry
         
     Returns:
         Configured Crew instance with all agents and tasks
     """
-    # Create all agents
-    project_manager = create_project_manager()
-    tech_lead = create_tech_lead()
-    developer = create_developer()
-    tester = create_tester()
+    # Start connecting to GitHub in the background while the crew is assembled
+    warm_github_tools()
     
-    # Create all tasks
-    tasks = create_all_tasks(project_description)
+    # Get the shared agents (built once per process)
+    agents = agents or get_squad_agents()
+    
+    # Create all tasks bound to those same agents
+    tasks = create_all_tasks(project_description, agents)
     
     # Create and configure the crew
     crew = Crew(
-        agents=[project_manager, tech_lead, developer, tester],
+        agents=list(agents.values()),
         tasks=tasks,
-        process=Process.sequential,  # Tasks will be executed in sequence
-        verbose=2,  # Detailed output
+        process=Process.sequential,  # Used by crew.kickoff(); run_it_squad drives the tasks itself
+        verbose=True,  # Detailed output
         full_output=True  # Return full output including individual task results
     )
     
     return crew
 
 
-def run_it_squad(project_description: str) -> dict:
+def _execute_in_task_scope(
+    node: TaskNode,
+    context: str,
+    checkpoint: Optional[CheckpointStore] = None,
+    resume: bool = False,
+    speculation: Optional[Speculation] = None
+):
+    """
+    Run a task node with its calls tagged by task and role (see tracing.py),
+    reporting its start and end to stream consumers (see streaming.py).
+
+    With a checkpoint, the output and GitHub side effects of the task are saved
+    when it completes, and with resume a task already in the checkpoint returns
+    its saved output without running again, reporting the GitHub writes it
+    already made (see checkpoint.py). With a
+    speculation, speculative tasks run as drafts reconciled with the outputs
+    they started without (see speculation.py).
+    """
+    role = getattr(node.task.agent.llm, "role", None) if node.task.agent else None
+    with task_scope(node.name, role):
+        if resume and checkpoint is not None:
+            saved = checkpoint.load(node.task)
+            if saved is not None:
+                side_effects = checkpoint.side_effects(node.name)
+                if side_effects:
+                    print(f"⏩ {node.name}: {len(side_effects)} operações no GitHub já realizadas não serão repetidas "
+                          f"({', '.join(effect['mode'] for effect in side_effects)})")
+                emit("task_finished", output=saved.raw, restored=True, side_effects=side_effects)
+                if speculation is not None:
+                    speculation.publish(node.name, saved)
+                return saved
+        emit("task_started", depends_on=list(node.depends_on))
+        side_effects = record_side_effects()
+        if speculation is None:
+            output = execute_node(node, context)
+        else:
+            try:
+                output = speculation.execute(node, context, execute_node)
+            except BaseException as e:
+                speculation.fail(node.name, e)
+                raise
+            speculation.publish(node.name, output)
+        if checkpoint is not None:
+            checkpoint.save(node.task, output, side_effects)
+        emit("task_finished", output=output.raw)
+        return output
+
+
+def kickoff_task_graph(
+    crew: Crew,
+    max_concurrency: int = 2,
+    dependencies: Optional[dict[str, tuple[str, ...]]] = None,
+    context_budget: Optional[ContextBudget] = None,
+    checkpoint: Optional[CheckpointStore] = None,
+    resume: bool = False,
+    delegation: Optional[DelegationController] = None,
+    speculation: Optional[Speculation] = None,
+    context_builder: Optional[Callable] = None
+) -> CrewOutput:
+    """
+    Runs the crew's tasks with the dependency-graph scheduler.
+    
+    Each task starts as soon as the tasks it consumes are done, with at most
+    max_concurrency tasks running at once, and receives only the outputs of
+    those tasks, compressed to the context token budget.
+    
+    Args:
+        crew: Crew created by create_it_squad_crew
+        max_concurrency: Maximum number of tasks executing at the same time
+        dependencies: Inputs of each task; defaults to TASK_DEPENDENCIES
+        context_budget: Builds and measures each task's context; defaults to a new ContextBudget
+        checkpoint: Store that receives each completed task (see checkpoint.py)
+        resume: Reuse the outputs of tasks already in the checkpoint instead of running them
+        delegation: Budget and repeated-request cache for delegations; defaults to a new
+            DelegationController (see delegation.py)
+        speculation: Runs speculative tasks ahead of some of their inputs; the
+            dependencies must not include those inputs (see speculation.py)
+        context_builder: Builds each task's context from finished outputs; defaults
+            to context_budget.build (see memory.with_memory)
+        
+    Returns:
+        CrewOutput whose raw output is the last task's output
+    """
+    for agent in crew.agents:
+        agent.crew = crew
+    
+    # Same delegation tools the sequential process would give each task, under a delegation budget
+    delegation = delegation or DelegationController()
+    for task in crew.tasks:
+        if task.agent and task.agent.allow_delegation:
+            coworkers = [agent for agent in crew.agents if agent is not task.agent]
+            task.tools = list(task.tools or []) + delegation.wrap(task.agent.get_delegation_tools(coworkers))
+    
+    context_budget = context_budget or ContextBudget()
+    nodes = nodes_from_tasks({task.name: task for task in crew.tasks}, dependencies or TASK_DEPENDENCIES)
+    outputs = run_task_graph_sync(
+        nodes,
+        max_concurrency=max_concurrency,
+        execute=partial(_execute_in_task_scope, checkpoint=checkpoint, resume=resume, speculation=speculation),
+        context_builder=context_builder or context_budget.build
+    )
+    
+    final_output = outputs[crew.tasks[-1].name]
+    return CrewOutput(
+        raw=final_output.raw,
+        pydantic=final_output.pydantic,
+        json_dict=final_output.json_dict,
+        tasks_output=list(outputs.values()),
+        token_usage=crew.calculate_usage_metrics()
+    )
+
+
+def run_it_squad(
+    project_description: str,
+    parallel: bool = False,
+    max_concurrency: int = 2,
+    agents: Optional[dict[str, Agent]] = None,
+    resume: bool = False,
+    repository: Optional[str] = None,
+    speculative: bool = False
+) -> dict:
     """
     Runs the IT squad crew with the given project description.
     
     Args:
         project_description: Description of the project to be executed
+        parallel: Run independent tasks concurrently (see scheduler.py) instead of sequentially
+        max_concurrency: Maximum number of tasks running at once in parallel mode
+        agents: Agents keyed by role; concurrent runs must each pass their own
+            (see agents.checkout_squad)
+        resume: Skip the tasks completed by a previous run of the same project
+            and task definitions (see checkpoint.py)
+        repository: GitHub repository ("owner/repo") the run's tools operate on;
+            defaults to GITHUB_REPOSITORY (see tools.repository_scope)
+        speculative: In the sequential flow, draft the testing task alongside the
+            implementation and reconcile it afterwards (see speculation.py)
         
     Returns:
-        Dictionary containing the results of all tasks
+        CrewOutput with the output of every task, or with RESULT_STORE on a
+        RunResult keeping large outputs on disk (see results.py)
     """
     print("="*80)
     print("🚀 Iniciando IT Squad com CrewAI")
     print("="*80)
     print(f"\nDescrição do Projeto:\n{project_description}\n")
+    if repository:
+        print(f"📦 Repositório: {repository}")
     print("="*80)
     
     # Create the crew
-    crew = create_it_squad_crew(project_description)
+    crew = create_it_squad_crew(project_description, agents)
+    
+    # Every completed task is checkpointed, so a failed run can be resumed
+    checkpoint = CheckpointStore(run_key(project_description, crew.tasks, repository))
+    if resume and checkpoint.completed():
+        print(f"⏩ Retomando execução; tarefas já concluídas: {', '.join(checkpoint.completed())}")
+    elif not resume:
+        checkpoint.clear()
     
     # Execute the crew
     print("\n📋 Executando o squad de TI...\n")
-    result = crew.kickoff()
+    # Tasks receive only the outputs they consume, summarized to a token budget
+    context_budget = ContextBudget()
+    delegation = DelegationController()
+    speculation = Speculation(max_context_tokens=context_budget.max_tokens)
+    # Outputs of the same tasks in similar past projects, when MEMORY_INDEX is on
+    memory = get_default_memory()
+    context_builder = context_budget.build
+    if memory is not None:
+        context_builder = with_memory(context_budget.build, memory, project_description, exclude_run=checkpoint.key)
+    with repository_scope(repository), trace_run() as tracer:
+        try:
+            if parallel:
+                result = kickoff_task_graph(
+                    crew,
+                    max_concurrency=max_concurrency,
+                    context_budget=context_budget,
+                    checkpoint=checkpoint,
+                    resume=resume,
+                    delegation=delegation,
+                    context_builder=context_builder
+                )
+            elif speculative:
+                # The testing draft runs next to the implementation, hence two slots
+                result = kickoff_task_graph(
+                    crew,
+                    max_concurrency=2,
+                    dependencies=speculative_dependencies(sequential_dependencies()),
+                    context_budget=context_budget,
+                    checkpoint=checkpoint,
+                    resume=resume,
+                    delegation=delegation,
+                    speculation=speculation,
+                    context_builder=context_builder
+                )
+            else:
+                result = kickoff_task_graph(
+                    crew,
+                    max_concurrency=1,
+                    dependencies=sequential_dependencies(),
+                    context_budget=context_budget,
+                    checkpoint=checkpoint,
+                    resume=resume,
+                    delegation=delegation,
+                    context_builder=context_builder
+                )
+        finally:
+            # Warm agents would otherwise keep this run's transcripts, tool results and crew
+            release_run_state(crew.agents)
+    # Every task finished, so there is nothing left to resume
+    checkpoint.clear()
     
     print("\n" + "="*80)
     print("✅ Squad de TI finalizado!")
     print("="*80)
+    print("\n🔢 Tokens de prompt por tarefa:")
+    print(context_budget.format_report())
+    print(f"\n🤝 Delegações: {delegation.format_report()}")
+    if speculative and not parallel:
+        print(f"🔮 Especulação: {speculation.format_report()}")
+    if memory is not None:
+        memory.add(
+            checkpoint.key,
+            project_description,
+            {output.name: (output.agent, output.raw) for output in result.tasks_output}
+        )
+        print(f"🧠 Memória: {memory.format_report()}")
+    print("\n⏱️  Chamadas por agente e tarefa:")
+    print(tracer.format_summary())
     
-    return result
+    # Callers keep a small handle; large outputs are read from disk on access
+    store = get_default_store()
+    return store.compact(result) if store is not None else result
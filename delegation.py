@@ -0,0 +1,110 @@
+"""
+Delegation Control
+This module bounds the delegation between agents within a run.
+
+The Project Manager and the Tech Lead may delegate work or ask questions to
+their coworkers, and each delegation is a full agent execution. Without limits,
+agents can bounce the same request back and forth, multiplying LLM calls
+without progress. Every delegation tool call goes through a controller that:
+
+- caps the number of delegations per task
+- hashes each request (tool, coworker and normalized task text) and answers a
+  repeated, near-identical request with the earlier answer instead of running
+  the coworker again
+
+Requests over a cap get a message telling the agent to finish the work itself,
+so the worst-case number of agent executions per task is 1 + max_per_task.
+Delegations do not nest: delegation tools are added to the delegating task
+(see crew.kickoff_task_graph), and the coworker runs with its own tools only.
+
+Configuration (environment):
+- DELEGATION_MAX_PER_TASK: delegations per task (default 3)
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Any, Callable, Optional
+from crewai.tools import BaseTool
+from tracing import current_task
+
+REPEATED_NOTE = "(This coworker already answered the same request; use this answer instead of asking again.)"
+LIMIT_NOTE = "Delegation limit reached ({reason}). Do not delegate again; complete the work yourself with what you have."
+
+
+def request_key(tool_name: str, arguments: dict) -> str:
+    """
+    Hash a delegation request so formatting and wording-case variations share a key.
+    """
+    coworker = str(arguments.get("coworker") or arguments.get("co_worker") or "")
+    request = str(arguments.get("task") or arguments.get("question") or "")
+    normalized = [" ".join(re.sub(r"[^\w\s]", " ", text.casefold()).split()) for text in (tool_name, coworker, request)]
+    return hashlib.sha256("\x00".join(normalized).encode("utf-8")).hexdigest()
+
+
+class DelegationController:
+    """
+    Delegation budget and repeated-request cache for one run.
+    """
+
+    def __init__(self, max_per_task: Optional[int] = None):
+        self.max_per_task = max_per_task if max_per_task is not None else int(os.getenv("DELEGATION_MAX_PER_TASK", "3"))
+        self.delegated = 0
+        self.reused = 0
+        self.refused = 0
+        self._per_task: dict[str, int] = {}
+        self._answers: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def run(self, tool_name: str, arguments: dict, call: Callable[[], str]) -> str:
+        """
+        Run a delegation tool call within the budget, or answer it without running the coworker.
+        """
+        key = request_key(tool_name, arguments)
+        task = current_task.get() or "-"
+        with self._lock:
+            if key in self._answers:
+                self.reused += 1
+                return f"{self._answers[key]}\n\n{REPEATED_NOTE}"
+            if self._per_task.get(task, 0) >= self.max_per_task:
+                self.refused += 1
+                return LIMIT_NOTE.format(reason=f"{self.max_per_task} per task")
+            self._per_task[task] = self._per_task.get(task, 0) + 1
+            self.delegated += 1
+
+        answer = call()
+        with self._lock:
+            self._answers[key] = answer
+        return answer
+
+    def wrap(self, tools: list[BaseTool]) -> list[BaseTool]:
+        """
+        Route a list of delegation tools (Agent.get_delegation_tools) through this controller.
+        """
+        return [ControlledDelegationTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            inner=tool,
+            controller=self
+        ) for tool in tools]
+
+    def format_report(self) -> str:
+        """
+        Printable summary of the delegations of the run.
+        """
+        return (f"{self.delegated} executadas, {self.reused} respondidas com resposta anterior "
+                f"(chamadas economizadas), {self.refused} recusadas por limite")
+
+
+class ControlledDelegationTool(BaseTool):
+    """
+    Delegation tool proxy that runs its CrewAI tool through a DelegationController.
+    """
+
+    inner: Any = None
+    controller: Any = None
+
+    def _run(self, *args: Any, **kwargs: Any) -> str:
+        return self.controller.run(self.name, kwargs, lambda: self.inner.run(*args, **kwargs))
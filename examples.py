@@ -2,12 +2,12 @@
 Example script showing how to use the IT Squad with different project types.
 """
 
+import sys
 from crew import run_it_squad
 
 
-def example_web_app():
-    """Example: Building a web application"""
-    project_description = """
+# Project descriptions used by the examples below
+WEB_APP = """
     Criar uma aplicação web de blog pessoal com:
     - Sistema de posts com título, conteúdo e tags
     - Comentários em posts
@@ -15,14 +15,9 @@ def example_web_app():
     - Interface responsiva
     - Painel administrativo
     """
-    
-    print("\n🌐 Exemplo: Aplicação Web de Blog")
-    return run_it_squad(project_description)
 
 
-def example_api_service():
-    """Example: Building an API service"""
-    project_description = """
+API_SERVICE = """
     Desenvolver uma API RESTful para gerenciamento de usuários:
     - CRUD completo de usuários
     - Autenticação JWT
@@ -31,14 +26,9 @@ def example_api_service():
     - Documentação OpenAPI/Swagger
     - Logs estruturados
     """
-    
-    print("\n🔌 Exemplo: API RESTful")
-    return run_it_squad(project_description)
 
 
-def example_data_pipeline():
-    """Example: Building a data pipeline"""
-    project_description = """
+DATA_PIPELINE = """
     Construir um pipeline de dados para análise:
     - Ingestão de dados de múltiplas fontes
     - Limpeza e transformação de dados
@@ -47,14 +37,9 @@ def example_data_pipeline():
     - Agendamento automatizado
     - Alertas e monitoramento
     """
-    
-    print("\n📊 Exemplo: Pipeline de Dados")
-    return run_it_squad(project_description)
 
 
-def example_automation_tool():
-    """Example: Building an automation tool"""
-    project_description = """
+AUTOMATION_TOOL = """
     Desenvolver ferramenta de automação DevOps:
     - Scripts de deploy automatizado
     - Monitoramento de serviços
@@ -63,18 +48,73 @@ def example_automation_tool():
     - Interface CLI
     - Notificações de status
     """
+
+
+def example_web_app():
+    """Example: Building a web application"""
+    project_description = WEB_APP
+    
+    print("\n🌐 Exemplo: Aplicação Web de Blog")
+    return run_it_squad(project_description)
+
+
+def example_api_service():
+    """Example: Building an API service"""
+    project_description = API_SERVICE
+    
+    print("\n🔌 Exemplo: API RESTful")
+    return run_it_squad(project_description)
+
+
+def example_data_pipeline():
+    """Example: Building a data pipeline"""
+    project_description = DATA_PIPELINE
+    
+    print("\n📊 Exemplo: Pipeline de Dados")
+    return run_it_squad(project_description)
+
+
+def example_automation_tool():
+    """Example: Building an automation tool"""
+    project_description = AUTOMATION_TOOL
     
     print("\n🤖 Exemplo: Ferramenta de Automação")
     return run_it_squad(project_description)
 
 
+EXAMPLES = {
+    "web_app": WEB_APP,
+    "api_service": API_SERVICE,
+    "data_pipeline": DATA_PIPELINE,
+    "automation_tool": AUTOMATION_TOOL,
+}
+
+
+def run_examples(names: list[str], output_path: str = "examples_results.jsonl", concurrency: int = 4) -> dict:
+    """
+    Run several examples concurrently with the batch runner (see batch.py).
+    
+    Results are appended to output_path as each example finishes.
+    """
+    from batch import run_batch
+    
+    items = [{"id": name, "project_description": EXAMPLES[name]} for name in names]
+    return run_batch(items, output_path, concurrency=concurrency)
+
+
 if __name__ == "__main__":
-    # Escolha qual exemplo executar descomentando a linha correspondente
+    # Uso: python examples.py web_app api_service   (ou "all" para todos)
+    selected = sys.argv[1:]
+    if selected == ["all"]:
+        selected = list(EXAMPLES)
     
-    # example_web_app()
-    # example_api_service()
-    # example_data_pipeline()
-    # example_automation_tool()
+    unknown = [name for name in selected if name not in EXAMPLES]
+    if not selected or unknown:
+        if unknown:
+            print(f"❌ Exemplos desconhecidos: {', '.join(unknown)}")
+        print(f"\n💡 Uso: python examples.py <{'|'.join(EXAMPLES)}|all> [...]")
+        print("Ou modifique main.py com seu próprio projeto.")
+        sys.exit(1)
     
-    print("\n💡 Descomente uma das funções acima para executar um exemplo!")
-    print("Ou modifique main.py com seu próprio projeto.")
+    summary = run_examples(selected)
+    print(f"\n📦 Exemplos finalizados: {summary}")
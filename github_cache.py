@@ -0,0 +1,371 @@
+"""
+GitHub Response Cache
+This module caches read-only GitHub tool calls for the IT squad.
+
+All agents share the same GitHub tools and every task asks them to look at
+repositories, issues and pull requests, so the same reads repeat within a run
+and across runs in the same process. Read operations are cached in a bounded
+LRU keyed by repository, active branch, operation and arguments.
+
+Entries are served as-is while younger than the TTL. Stale entries are
+revalidated with conditional requests (If-None-Match) on the REST resources the
+read depends on: the branch head for file reads and listings, the issue or pull
+request (and its comments) for their reads, the issue, pull request, branch or
+release lists for the list reads. The ETags are taken before the read runs, so
+a 304 on every resource means the entry is still accurate and it is kept
+without re-running the tool. Reads with no such resource (searches) expire at
+the TTL. Errors the toolkit wrapper returns as results are never cached. Write
+operations drop the entries they can affect.
+
+The conditional requests go through the wrapper's own PyGithub client, so they
+use the same credentials (GitHub App installation or token) and API URL as the
+tools; the key holds the branch of that resolved wrapper. The cost is one extra
+request per resource of a cache miss or stale hit, made at most every 10
+seconds per resource: a 304 does not count against the rate limit, a 200 does,
+and PyGithub spaces the requests of a client (seconds_between_requests).
+When the wrapper has no client to validate with, entries expire at the TTL.
+
+Configuration (environment):
+- GITHUB_CACHE_TTL: seconds an entry is served without revalidation (default 300, 0 disables)
+- GITHUB_CACHE_SIZE: maximum number of cached entries (default 256)
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from tracing import annotate
+
+
+# Toolkit operations that only read from GitHub
+READ_MODES = {
+    "get_issues",
+    "get_issue",
+    "list_open_pull_requests",
+    "get_pull_request",
+    "list_pull_request_files",
+    "read_file",
+    "list_files_in_main_branch",
+    "list_files_in_bot_branch",
+    "list_branches_in_repo",
+    "get_files_from_directory",
+    "search_issues_and_prs",
+    "search_code",
+    "get_latest_release",
+    "get_releases",
+    "get_release",
+}
+
+# Read operations (or prefixes) invalidated by each write operation.
+# Writes not listed here invalidate every entry of the repository.
+_FILE_READS = (
+    "read_file",
+    "list_files_",
+    "get_files_from_directory",
+    "search_code",
+    "list_pull_request_files",
+    "get_pull_request",
+)
+INVALIDATES = {
+    "comment_on_issue": ("get_issue", "get_issues", "search_issues_and_prs"),
+    "create_file": _FILE_READS,
+    "update_file": _FILE_READS,
+    "delete_file": _FILE_READS,
+    "create_pull_request": (
+        "list_open_pull_requests",
+        "get_pull_request",
+        "get_issues",
+        "search_issues_and_prs",
+    ),
+    "create_review_request": ("get_pull_request",),
+    "create_branch": ("list_branches_in_repo",),
+    # The active branch is part of the cache key, so switching needs no invalidation
+    "set_active_branch": (),
+}
+
+
+# Errors the toolkit wrapper returns as its result instead of raising, by operation
+# (GitHubAPIWrapper catches the exception and returns its message)
+ERROR_PREFIXES = {
+    "read_file": "File not found `",
+    "list_files_in_bot_branch": "Error: ",
+    "get_files_from_directory": "Error: status code ",
+    "comment_on_issue": "Unable to make comment due to error:",
+    "create_file": "Unable to make file due to error:",
+    "update_file": "Unable to update file due to error:",
+    "delete_file": "Unable to delete file due to error:",
+    "create_pull_request": "Unable to make pull request due to error:",
+    "create_review_request": "Failed to create a review request with error",
+}
+# Operations that return str(exception) on failure, recognized by their success messages
+SUCCESS_PREFIXES = {
+    "list_files_in_main_branch": ("Found ", "No files found in the main branch"),
+    "list_branches_in_repo": ("Found ", "No branches found in the repository"),
+}
+UNAVAILABLE_MESSAGE = "GitHub tools are not available"
+
+# HTTP status inside a wrapper error: str(GithubException) is '403 {"message": ...}'
+_STATUS = re.compile(r"(?:^|\s|:)([1-5]\d\d) \{|status code ([1-5]\d\d)")
+
+
+def wrapper_error(mode: str, result: str) -> bool:
+    """
+    Whether a tool result is an error the toolkit wrapper returned instead of raising.
+    """
+    if result.startswith(UNAVAILABLE_MESSAGE):
+        return True
+    if mode in ERROR_PREFIXES:
+        return result.startswith(ERROR_PREFIXES[mode])
+    if mode in SUCCESS_PREFIXES:
+        return not result.startswith(SUCCESS_PREFIXES[mode])
+    return False
+
+
+def error_status(result: str) -> Optional[int]:
+    """
+    HTTP status reported in a wrapper error, if any.
+    """
+    match = _STATUS.search(result)
+    return int(match.group(1) or match.group(2)) if match else None
+
+
+def _number(instructions: str) -> Optional[int]:
+    try:
+        return int(str(instructions).strip())
+    except ValueError:
+        return None
+
+
+def revalidation_paths(repository: str, branch: Optional[str], mode: str, instructions: str) -> Optional[tuple]:
+    """
+    REST paths whose ETags tell whether a cached read is still accurate, or None if it has none.
+    """
+    base = f"/repos/{repository}"
+    if mode in ("read_file", "list_files_in_bot_branch", "get_files_from_directory"):
+        return (f"{base}/commits/{branch or 'HEAD'}",)
+    if mode == "list_files_in_main_branch":
+        return (f"{base}/commits/{os.getenv('GITHUB_BASE_BRANCH') or 'HEAD'}",)
+    if mode == "list_branches_in_repo":
+        return (f"{base}/branches",)
+    if mode == "get_issues":
+        return (f"{base}/issues?state=open",)
+    if mode == "list_open_pull_requests":
+        return (f"{base}/pulls?state=open",)
+    if mode in ("get_latest_release", "get_releases", "get_release"):
+        return (f"{base}/releases",)
+    number = _number(instructions)
+    if number is None:
+        return None
+    if mode == "get_issue":
+        return (f"{base}/issues/{number}", f"{base}/issues/{number}/comments")
+    if mode in ("get_pull_request", "list_pull_request_files"):
+        return (f"{base}/pulls/{number}", f"{base}/issues/{number}/comments")
+    return None
+
+
+@dataclass
+class CacheEntry:
+    value: str
+    stored_at: float
+    etags: Optional[tuple]
+
+
+class ResourceValidator:
+    """
+    Tracks the ETags of GitHub REST resources with conditional requests.
+
+    Requests are sent with a PyGithub Requester (the wrapper's client), so they
+    are authenticated like the tool calls. A resource is checked at most every
+    min_interval seconds; requests run outside the lock, so concurrent reads of
+    other resources do not wait.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 10.0,
+        max_resources: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_interval = min_interval
+        self.max_resources = max_resources
+        self.clock = clock
+        self.requests = 0
+        self._state: "OrderedDict[str, tuple[Optional[str], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def current_etag(self, path: str, requester: Any) -> Optional[str]:
+        """
+        Return the latest ETag of a resource, or None if it is unknown.
+        """
+        with self._lock:
+            etag, checked_at = self._state.get(path, (None, float("-inf")))
+        if self.clock() - checked_at < self.min_interval:
+            return etag
+        etag = self._fetch(requester, path, etag)
+        with self._lock:
+            self.requests += 1
+            self._state[path] = (etag, self.clock())
+            self._state.move_to_end(path)
+            while len(self._state) > self.max_resources:
+                self._state.popitem(last=False)
+        return etag
+
+    def current_etags(self, paths: Optional[tuple], requester: Any) -> Optional[tuple]:
+        """
+        ETags of several resources, or None if any of them is unknown or there is no client.
+        """
+        if not paths or requester is None:
+            return None
+        etags = tuple(self.current_etag(path, requester) for path in paths)
+        return None if None in etags else etags
+
+    def _fetch(self, requester: Any, path: str, etag: Optional[str]) -> Optional[str]:
+        headers = {"If-None-Match": etag} if etag else {}
+        try:
+            status, response_headers, _ = requester.requestJson("GET", path, headers=headers)
+        except Exception:
+            # Unknown state: returning None makes every stale entry miss
+            return None
+        if status == 304:
+            return etag
+        return response_headers.get("etag") if status == 200 else None
+
+
+class GitHubResponseCache:
+    """
+    Bounded LRU of GitHub read results with TTL and ETag revalidation.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_entries: int = 256,
+        validator: Optional[ResourceValidator] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.validator = validator or ResourceValidator(clock=clock)
+        self.clock = clock
+        self._entries: "OrderedDict[tuple, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def get(self, key: tuple, requester: Any = None) -> Optional[str]:
+        """
+        Return the cached value for key, revalidating it with requester if it is stale.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if self.clock() - entry.stored_at >= self.ttl:
+            etags = self.validator.current_etags(self._paths(key), requester) if entry.etags is not None else None
+            self.revalidations += 1
+            if etags is None or etags != entry.etags:
+                with self._lock:
+                    self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            entry.stored_at = self.clock()
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def _paths(self, key: tuple) -> Optional[tuple]:
+        repository, branch, mode, instructions = key
+        return revalidation_paths(repository, branch, mode, instructions) if repository else None
+
+    def resource_etags(self, key: tuple, requester: Any) -> Optional[tuple]:
+        """
+        Current ETags of the resources behind key; take them before running the read.
+        """
+        return self.validator.current_etags(self._paths(key), requester)
+
+    def put(self, key: tuple, value: str, etags: Optional[tuple] = None) -> None:
+        """
+        Store a read result with the ETags its resources had before it was read
+        (None: the entry expires at the TTL).
+        """
+        with self._lock:
+            self._entries[key] = CacheEntry(value=value, stored_at=self.clock(), etags=etags)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, repository: Optional[str], write_mode: str) -> None:
+        """
+        Drop the entries of a repository that a write operation may have changed.
+        """
+        prefixes = INVALIDATES.get(write_mode)
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] != repository:
+                    continue
+                if prefixes is None or any(key[2].startswith(p) for p in prefixes):
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _requester(wrapper) -> Any:
+    """
+    PyGithub Requester of a wrapper's repository, authenticated like its tool calls, or None.
+    """
+    return getattr(getattr(wrapper, "github_repo_instance", None), "requester", None)
+
+
+def create_cache_middleware(cache: GitHubResponseCache):
+    """
+    Build a tools.py middleware that serves reads from cache and invalidates on writes.
+    """
+    def middleware(provider, mode: str, instructions: str, call_next) -> str:
+        if mode not in READ_MODES:
+            result = call_next(mode, instructions)
+            cache.invalidate(provider.repository, mode)
+            return result
+
+        try:
+            # The read resolves the wrapper anyway; resolving first keys the entry by its real branch
+            wrapper = provider.resolve()
+        except Exception:
+            return call_next(mode, instructions)
+        key = (provider.repository, getattr(wrapper, "active_branch", None), mode, instructions)
+        requester = _requester(wrapper)
+        cached = cache.get(key, requester)
+        if cached is not None:
+            annotate(cache_hit=True)
+            return cached
+        # Taken before the read: a change made while it runs shows up as a new ETag
+        etags = cache.resource_etags(key, requester)
+        result = call_next(mode, instructions)
+        if not wrapper_error(mode, result):
+            cache.put(key, result, etags)
+        return result
+
+    return middleware
+
+
+def get_default_cache() -> Optional[GitHubResponseCache]:
+    """
+    Build the process-wide cache from the environment, or None when disabled.
+    """
+    ttl = float(os.getenv("GITHUB_CACHE_TTL", "300"))
+    if ttl <= 0:
+        return None
+    return GitHubResponseCache(ttl=ttl, max_entries=int(os.getenv("GITHUB_CACHE_SIZE", "256")))
@@ -0,0 +1,157 @@
+"""
+LLM Completion Cache
+This module provides an opt-in, on-disk completion cache for the agents' LLM clients.
+
+Re-running the squad with an unchanged project description replays completed
+steps from a local SQLite file instead of paying the model latency again.
+Entries are keyed by model, temperature, agent role and the normalized message
+list, and the file is kept under a size limit by evicting the least recently
+used entries.
+
+Configuration (environment):
+- LLM_CACHE: "off" (default), "on", or "deterministic" (only for temperature 0)
+- LLM_CACHE_PATH: SQLite file location (default .cache/llm_cache.sqlite)
+- LLM_CACHE_MAX_MB: size limit before eviction (default 256)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from tracing import annotate
+
+
+def normalize_messages(messages: list[dict]) -> str:
+    """
+    Serialize a message list so formatting-only differences share a key.
+    """
+    normalized = [
+        {
+            "role": message.get("role", ""),
+            "content": " ".join(str(message.get("content", "")).split()),
+        }
+        for message in messages
+    ]
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+
+
+def completion_key(model: str, temperature: Optional[float], role: Optional[str], messages: list[dict]) -> str:
+    """
+    Build the cache key for a completion request.
+    """
+    material = "\x00".join((model, repr(temperature), role or "", normalize_messages(messages)))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SQLiteCompletionCache:
+    """
+    Completion store backed by a size-bounded SQLite file.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, deterministic_only: bool = False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.deterministic_only = deterministic_only
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " key TEXT PRIMARY KEY,"
+                " role TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS completions_last_access ON completions (last_access)"
+            )
+
+    def applies_to(self, temperature: Optional[float]) -> bool:
+        return not self.deterministic_only or temperature == 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE completions SET last_access = ? WHERE key = ?", (time.time(), key)
+                )
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str, role: Optional[str] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, role, value, size, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, role or "", value, len(value.encode("utf-8")), time.time()),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM completions ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM completions WHERE key = ?", stale)
+
+    def clear(self, role: Optional[str] = None) -> None:
+        with self._lock, self._conn:
+            if role is None:
+                self._conn.execute("DELETE FROM completions")
+            else:
+                self._conn.execute("DELETE FROM completions WHERE role = ?", (role,))
+
+
+def create_cache_middleware(cache: SQLiteCompletionCache):
+    """
+    Build an agents.py LLM middleware that replays cached completions.
+    """
+    def middleware(llm, messages: list[dict], call_next) -> str:
+        if not cache.applies_to(llm.temperature):
+            return call_next(messages)
+        key = completion_key(llm.model, llm.temperature, getattr(llm, "role", None), messages)
+        cached = cache.get(key)
+        if cached is not None:
+            annotate(cache_hit=True)
+            return cached
+        result = call_next(messages)
+        if result:
+            cache.put(key, result, getattr(llm, "role", None))
+        return result
+
+    return middleware
+
+
+def get_default_cache() -> Optional[SQLiteCompletionCache]:
+    """
+    Build the completion cache from the environment, or None when LLM_CACHE is off.
+    """
+    mode = os.getenv("LLM_CACHE", "off").lower()
+    if mode in ("", "off", "0", "false"):
+        return None
+    return SQLiteCompletionCache(
+        path=os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite")),
+        max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024),
+        deterministic_only=(mode == "deterministic"),
+    )
@@ -1,21 +1,58 @@
 """
 Main execution script for the IT Squad with CrewAI
+
+The agent framework is imported only after the arguments are parsed and the
+configuration is checked, so --help and configuration errors return at once.
 """
 
+import argparse
 import os
-from dotenv import load_dotenv
-from crew import run_it_squad
+from settings import load_settings, missing_required
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parse command line options.
+    """
+    parser = argparse.ArgumentParser(description="Run the IT squad with CrewAI.")
+    parser.add_argument("--parallel", action="store_true",
+                        help="run independent tasks concurrently (dependency-graph scheduler)")
+    parser.add_argument("--speculative", action="store_true",
+                        help="draft the testing task alongside the implementation (see speculation.py)")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip the tasks a previous run of the same project completed (see checkpoint.py)")
+    parser.add_argument("--repository", metavar="OWNER/REPO",
+                        help="GitHub repository the tools operate on (default: GITHUB_REPOSITORY)")
+    parser.add_argument("--stream", action="store_true",
+                        help="print task events and LLM output as they are produced (see streaming.py)")
+    parser.add_argument("--batch", metavar="INPUT",
+                        help="JSONL file of project descriptions to run concurrently (see batch.py)")
+    parser.add_argument("--output", metavar="OUTPUT", default="batch_results.jsonl",
+                        help="JSONL file for batch results (default: batch_results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="crews running at the same time in batch and service mode")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="worker processes sharing the batch runs (0: one per CPU, see workers.py)")
+    parser.add_argument("--serve", action="store_true",
+                        help="keep the squad warm and accept projects over a local HTTP API (see service.py)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port of the service (default: 8765)")
+    parser.add_argument("--socket", metavar="PATH", help="serve on a Unix socket instead of TCP")
+    parser.add_argument("--queue-size", type=int, default=16,
+                        help="jobs waiting in the service before new ones are rejected")
+    return parser.parse_args(argv)
 
 
-def main():
+def main(argv=None):
     """
     Main function to run the IT squad.
     """
+    args = parse_args(argv)
+    
     # Load environment variables
-    load_dotenv()
+    load_settings()
     
     # Check for required environment variables
-    if not os.getenv("OPENAI_API_KEY"):
+    if "OPENAI_API_KEY" in missing_required():
         print("❌ Erro: OPENAI_API_KEY não encontrada!")
         print("Por favor, configure sua chave API no arquivo .env")
         return
@@ -25,6 +62,23 @@ def main():
         print("As ferramentas do GitHub podem não funcionar corretamente.")
         print("Por favor, configure seu token do GitHub no arquivo .env")
     
+    if args.serve:
+        from service import serve
+        serve(port=args.port, socket_path=args.socket, concurrency=args.concurrency, max_queue=args.queue_size)
+        return
+    
+    if args.batch:
+        from batch import load_batch, run_batch
+        summary = run_batch(
+            load_batch(args.batch),
+            args.output,
+            concurrency=args.concurrency,
+            parallel=args.parallel,
+            processes=args.processes
+        )
+        print(f"\n📦 Batch finalizado: {summary}")
+        return
+    
     # Project description - you can customize this
     project_description = """
     Desenvolver uma aplicação web de gerenciamento de tarefas (TODO app) com as seguintes características:
@@ -46,8 +100,27 @@ def main():
     - Segurança básica
     """
     
+    if args.stream:
+        from streaming import render_event, stream_it_squad
+        for event in stream_it_squad(
+            project_description,
+            parallel=args.parallel,
+            resume=args.resume,
+            repository=args.repository,
+            speculative=args.speculative
+        ):
+            render_event(event, lambda text: print(text, end="", flush=True))
+        return
+    
     # Run the IT squad
-    result = run_it_squad(project_description)
+    from crew import run_it_squad
+    result = run_it_squad(
+        project_description,
+        parallel=args.parallel,
+        resume=args.resume,
+        repository=args.repository,
+        speculative=args.speculative
+    )
     
     # Print the final result
     print("\n📊 Resultado Final:")
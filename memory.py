@@ -0,0 +1,288 @@
+"""
+Memory Index
+This module keeps a local index of past task outputs so new runs can reuse them.
+
+Many project descriptions share architecture and testing patterns, yet every
+run starts from nothing. With the memory index on, the output of every
+completed task is added to a SQLite file together with its project description,
+task and role. When a task starts, the outputs of the same task in the most
+similar past projects are retrieved and appended to its context, so the agent
+can adapt a prior artifact instead of writing it from scratch.
+
+Similar projects are found by keyword search over the project descriptions,
+ranked with BM25 (SQLite FTS5, no extra dependency); the index has one short
+row per run, so lookups stay in the millisecond range with thousands of runs.
+Common Portuguese and English words are left out of the query, and a past
+project is only recalled if it shares at least MEMORY_MIN_OVERLAP distinct
+terms with the new one, so a single incidental word does not pull in an
+unrelated artifact.
+The full-text index is contentless and descriptions and outputs are stored
+zlib-compressed, so each text is kept once, compressed, and adding a run only
+writes that run's rows.
+
+Configuration (environment):
+- MEMORY_INDEX: "on" to index and recall past outputs (default off)
+- MEMORY_INDEX_PATH: SQLite file location (default .cache/memory.sqlite)
+- MEMORY_TOP_K: past artifacts recalled per task (default 2)
+- MEMORY_TOKEN_BUDGET: tokens of recalled artifacts per task (default 800)
+- MEMORY_MIN_OVERLAP: distinct query terms a past project must share to be recalled (default 2)
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+from context import summarize_to_budget
+from scheduler import CONTEXT_SEPARATOR
+
+# Query terms taken from a project description; longer descriptions add little to the ranking
+MAX_QUERY_TERMS = 48
+
+MEMORY_HEADER = "Artefatos de projetos anteriores semelhantes (adapte o que servir, não copie às cegas):"
+
+# Candidates read per search; the ones sharing too few terms are dropped before taking k
+CANDIDATES_PER_RESULT = 5
+
+_TERM = re.compile(r"\w{3,}", re.UNICODE)
+
+# Written without diacritics, as terms are compared after removing them (like the FTS tokenizer)
+STOPWORDS = frozenset("""
+    aos as ate com como das de dela dele deles do dos ela ele eles em entre era essa esse esta este eu foi
+    isso isto lhe mais mas mesmo muito nao nas nem nos nossa nosso num numa para pela pelas pelo pelos por
+    qual quando que quem sao sem ser seu seus sob sua suas tambem tem ter todo todos uma umas uns voce
+    all and any are but can for from has have into its not one our out that the their them then there
+    these this those was were what when which while who will with you your
+""".split())
+
+
+def _normalize(term: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", term) if not unicodedata.combining(c))
+
+
+def _terms(text: str) -> Iterator[str]:
+    for term in _TERM.findall(_normalize(text.casefold())):
+        if not term.isdigit() and term not in STOPWORDS:
+            yield term
+
+
+def query_terms(text: str) -> list[str]:
+    """
+    Distinct search terms of a text without diacritics or stopwords, in order of appearance.
+    """
+    terms: dict[str, None] = {}
+    for term in _terms(text):
+        terms.setdefault(term, None)
+        if len(terms) >= MAX_QUERY_TERMS:
+            break
+    return list(terms)
+
+
+@dataclass
+class MemoryHit:
+    run_key: str
+    task: str
+    role: str
+    project: str
+    output: str
+    score: float
+
+
+class MemoryIndex:
+    """
+    Past task outputs in a SQLite file, found through a BM25-ranked index of their projects.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.recalls = 0
+        self.recalled = 0
+        self.recall_seconds = 0.0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                " id INTEGER PRIMARY KEY,"
+                " run_key TEXT NOT NULL UNIQUE,"
+                " project BLOB NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS artifacts ("
+                " run_key TEXT NOT NULL,"
+                " task TEXT NOT NULL,"
+                " role TEXT NOT NULL,"
+                " output BLOB NOT NULL,"
+                " PRIMARY KEY (run_key, task))"
+            )
+            # Contentless: the descriptions live compressed in runs, the index only holds terms
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS runs_fts USING fts5("
+                " project, content='', tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    def add(self, run_key: str, project_description: str, outputs: dict[str, tuple[str, str]]) -> None:
+        """
+        Index the outputs of one run, replacing the ones an earlier run with the same key left.
+
+        Args:
+            run_key: Key of the run (see checkpoint.run_key)
+            project_description: Description of the project
+            outputs: (role, output) of each task, keyed by task name
+        """
+        with self._lock, self._conn:
+            known = self._conn.execute("SELECT 1 FROM runs WHERE run_key = ?", (run_key,)).fetchone()
+            if known is None:
+                cursor = self._conn.execute(
+                    "INSERT INTO runs (run_key, project, created_at) VALUES (?, ?, ?)",
+                    (run_key, zlib.compress(project_description.encode("utf-8")), time.time()),
+                )
+                self._conn.execute(
+                    "INSERT INTO runs_fts (rowid, project) VALUES (?, ?)", (cursor.lastrowid, project_description)
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO artifacts (run_key, task, role, output) VALUES (?, ?, ?, ?)",
+                [
+                    (run_key, task, role or "", zlib.compress(output.encode("utf-8")))
+                    for task, (role, output) in outputs.items() if output
+                ],
+            )
+
+    def search(
+        self,
+        project_description: str,
+        task: Optional[str] = None,
+        k: int = 2,
+        exclude_run: Optional[str] = None,
+        min_overlap: Optional[int] = None
+    ) -> list[MemoryHit]:
+        """
+        Outputs of the past projects most similar to a project description, best first.
+
+        Args:
+            project_description: Description of the new project
+            task: Only outputs of this task (e.g. "architecture")
+            k: Maximum number of results
+            exclude_run: Run key whose own outputs are skipped
+            min_overlap: Distinct query terms a past project must share (default MEMORY_MIN_OVERLAP)
+        """
+        min_overlap = min_overlap if min_overlap is not None else int(os.getenv("MEMORY_MIN_OVERLAP", "2"))
+        terms = query_terms(project_description)
+        if not terms or len(terms) < min_overlap or k <= 0:
+            return []
+        sql = (
+            "SELECT r.run_key, a.task, a.role, r.project, a.output, bm25(runs_fts) AS score"
+            " FROM runs_fts"
+            " JOIN runs r ON r.id = runs_fts.rowid"
+            " JOIN artifacts a ON a.run_key = r.run_key"
+            " WHERE runs_fts MATCH ?"
+        )
+        parameters: list = [" OR ".join(f'"{term}"' for term in terms)]
+        if task is not None:
+            sql += " AND a.task = ?"
+            parameters.append(task)
+        if exclude_run is not None:
+            sql += " AND r.run_key != ?"
+            parameters.append(exclude_run)
+        sql += " ORDER BY score LIMIT ?"
+        parameters.append(k * CANDIDATES_PER_RESULT)
+        wanted = set(terms)
+        started = time.perf_counter()
+        hits: list[MemoryHit] = []
+        with self._lock:
+            for run_key, task_name, role, project, output, score in self._conn.execute(sql, parameters):
+                project = zlib.decompress(project).decode("utf-8")
+                if len(wanted.intersection(_terms(project))) < min_overlap:
+                    continue
+                hits.append(MemoryHit(
+                    run_key=run_key,
+                    task=task_name,
+                    role=role,
+                    project=project,
+                    output=zlib.decompress(output).decode("utf-8"),
+                    score=score,
+                ))
+                if len(hits) >= k:
+                    break
+            self.recalls += 1
+            self.recalled += len(hits)
+            self.recall_seconds += time.perf_counter() - started
+        return hits
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM artifacts")
+            self._conn.execute("DELETE FROM runs")
+            self._conn.execute("INSERT INTO runs_fts (runs_fts) VALUES ('delete-all')")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def format_report(self) -> str:
+        """
+        Printable summary of the recalls of the run.
+        """
+        average_ms = 1000 * self.recall_seconds / self.recalls if self.recalls else 0.0
+        return (f"{self.recalled} artefatos anteriores recuperados em {self.recalls} buscas "
+                f"({average_ms:.1f} ms por busca, {self.count()} no índice)")
+
+
+def with_memory(
+    context_builder: Callable,
+    index: MemoryIndex,
+    project_description: str,
+    exclude_run: Optional[str] = None,
+    k: Optional[int] = None,
+    max_tokens: Optional[int] = None
+) -> Callable:
+    """
+    Wrap a scheduler context_builder so each task's context ends with the most
+    relevant past outputs of the same task, summarized to a token budget.
+    """
+    k = k if k is not None else int(os.getenv("MEMORY_TOP_K", "2"))
+    max_tokens = max_tokens if max_tokens is not None else int(os.getenv("MEMORY_TOKEN_BUDGET", "800"))
+
+    def build(node, outputs: dict) -> str:
+        context = context_builder(node, outputs)
+        hits = index.search(project_description, task=node.name, k=k, exclude_run=exclude_run)
+        if not hits:
+            return context
+        share = max_tokens // len(hits)
+        recalled = "\n\n".join(
+            f"[{hit.project[:120]}]\n{summarize_to_budget(hit.output, share)}" for hit in hits
+        )
+        memory = f"{MEMORY_HEADER}\n{recalled}"
+        return CONTEXT_SEPARATOR.join(part for part in (context, memory) if part)
+
+    return build
+
+
+_indexes: dict[str, MemoryIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_default_memory() -> Optional[MemoryIndex]:
+    """
+    The process-wide memory index from the environment, or None when MEMORY_INDEX is off.
+    """
+    if os.getenv("MEMORY_INDEX", "off").lower() in ("", "off", "0", "false"):
+        return None
+    path = os.getenv("MEMORY_INDEX_PATH", os.path.join(".cache", "memory.sqlite"))
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = MemoryIndex(path)
+        return _indexes[path]
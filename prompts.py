@@ -0,0 +1,178 @@
+"""
+Prompt Compaction
+This module keeps the prompts sent on every LLM call small and cache-friendly.
+
+CrewAI sends each agent's role, goal, backstory and tool descriptions as the
+system message of every call, and the task description as the first user
+message. Both are resent on every iteration of the agent loop, so:
+
+- task descriptions are compacted: the indentation of the triple-quoted
+  templates in tasks.py, trailing spaces and repeated blank lines are
+  removed from the template before the project description and upstream
+  context are inserted, so code or YAML in them keeps its indentation
+- the static instructions of each task come first and its variable parts
+  (project description, upstream context) last, so the system message plus
+  the start of the task message form a stable prefix that provider-side
+  prompt caching can reuse across calls and runs
+- GitHub tool descriptions are compacted the same way (see tools.py)
+
+prompt_report() counts the tokens of every component with and without
+compaction; the tool descriptions are counted as GitHubToolkit writes them
+and as they are sent. Run `python prompts.py` to print it.
+
+Configuration (environment):
+- PROMPT_COMPACTION: "off" sends the templates as written (default on)
+"""
+
+import contextvars
+import os
+import re
+import textwrap
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+_compaction: contextvars.ContextVar[Optional[bool]] = contextvars.ContextVar("prompt_compaction", default=None)
+
+
+def compaction_enabled() -> bool:
+    enabled = _compaction.get()
+    if enabled is None:
+        return os.getenv("PROMPT_COMPACTION", "on").lower() not in ("off", "0", "false")
+    return enabled
+
+
+@contextmanager
+def compaction(enabled: bool) -> Iterator[None]:
+    """
+    Turn compaction on or off for the prompts built inside the block.
+    """
+    token = _compaction.set(enabled)
+    try:
+        yield
+    finally:
+        _compaction.reset(token)
+
+
+def compact(text: str) -> str:
+    """
+    Remove layout-only whitespace: common and per-line indentation, trailing
+    spaces, runs of spaces and repeated blank lines.
+    """
+    if not compaction_enabled():
+        return text
+    lines = [" ".join(line.split()) for line in textwrap.dedent(text).splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def fill_template(template: str, **values: str) -> str:
+    """
+    Compact a template, then insert its variable parts as given.
+
+    Args:
+        template: str.format template, e.g. a task description from tasks.py
+        values: Text of each placeholder; its whitespace is kept
+    """
+    return compact(template).format(**values).strip()
+
+
+def _system_components(agent, originals: Optional[dict[str, str]] = None) -> dict[str, str]:
+    """
+    System message parts of an agent; with originals (tool name to uncompacted
+    description) the tool descriptions are counted as they were before compaction.
+    """
+    tools = []
+    for tool in agent.tools or []:
+        description = tool.description
+        original = (originals or {}).get(tool.name)
+        if original is not None:
+            # CrewAI wraps the description with the tool name and arguments; only swap the description
+            with compaction(True):
+                description = description.replace(compact(original), original)
+        tools.append(f"{tool.name}: {description}")
+    return {
+        "role": agent.role,
+        "goal": agent.goal,
+        "backstory": agent.backstory,
+        "tools": "\n".join(tools),
+    }
+
+
+def _task_components(task, project_description: str) -> dict[str, str]:
+    description = task.description
+    components = {}
+    if project_description and project_description in description:
+        components["project_description"] = project_description
+        description = description.replace(project_description, "")
+    components["instructions"] = description
+    components["expected_output"] = task.expected_output
+    return components
+
+
+def prompt_report(project_description: str) -> list[dict]:
+    """
+    Token counts of every prompt component, with compaction off (before) and on (after).
+
+    System components (role, goal, backstory, tools) are the stable prefix
+    resent on every call of an agent; task components are the first user message.
+    """
+    from context import count_tokens
+    from agents import get_squad_agents
+    from tasks import create_named_tasks
+    from tools import toolkit_descriptions
+
+    agents = get_squad_agents()
+    description = project_description.strip()
+    builds = {}
+    for label, enabled in (("before", False), ("after", True)):
+        with compaction(enabled):
+            builds[label] = (description, create_named_tasks(description, agents))
+
+    rows = []
+    originals = toolkit_descriptions()
+    for role, agent in agents.items():
+        before = _system_components(agent, originals)
+        for component, text in _system_components(agent).items():
+            rows.append({
+                "scope": role,
+                "component": component,
+                "before": count_tokens(before[component]),
+                "after": count_tokens(text),
+                "stable": True,
+            })
+    for name in builds["after"][1]:
+        before = _task_components(builds["before"][1][name], builds["before"][0])
+        after = _task_components(builds["after"][1][name], builds["after"][0])
+        for component in before:
+            rows.append({
+                "scope": name,
+                "component": component,
+                "before": count_tokens(before[component]),
+                "after": count_tokens(after.get(component, "")),
+                "stable": component != "project_description",
+            })
+    return rows
+
+
+def format_report(rows: list[dict]) -> str:
+    """
+    Printable table of prompt_report() with totals.
+    """
+    header = f"{'Escopo':<17}{'Componente':<22}{'Antes':>8}{'Depois':>8}  Prefixo estável"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(f"{row['scope'][:16]:<17}{row['component']:<22}{row['before']:>8}{row['after']:>8}  "
+                     f"{'sim' if row['stable'] else 'não'}")
+    before = sum(row["before"] for row in rows)
+    after = sum(row["after"] for row in rows)
+    saved = 100 * (before - after) / before if before else 0.0
+    lines.append(f"Total: {before} → {after} tokens ({saved:.1f}% a menos)")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    from settings import load_settings
+    load_settings()
+    from examples import WEB_APP
+    # Through the imported module, whose compaction switch tasks.py uses
+    import prompts
+    print(prompts.format_report(prompts.prompt_report(WEB_APP)))
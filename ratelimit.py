@@ -0,0 +1,399 @@
+"""
+Rate Limiting
+This module governs the request rate of OpenAI and GitHub calls for the whole process.
+
+Every agent LLM call and every GitHub tool call goes through the governor of
+its provider, so many crews running concurrently in one process (batch runs,
+service mode) share a single request budget instead of each hammering the API:
+
+- admission: a token bucket per provider (OPENAI_RPM / GITHUB_RPM)
+- quota tracking: the remaining requests and reset time reported in response
+  headers; when the quota runs low, calls are spread evenly until the reset,
+  and when it is exhausted every caller waits for the reset together
+- retries: rate-limited (429, GitHub secondary limits) and transient (5xx,
+  connection) failures are retried with jittered exponential backoff, honoring
+  Retry-After; a 429 also blocks the provider for every caller, so concurrent
+  agents back off together instead of retrying one after another
+
+OpenAI headers are read by GovernedTransport, installed on the pooled HTTP
+clients in agents.py; GitHub headers are read from PyGithub after each call.
+
+Configuration (environment):
+- OPENAI_RPM: requests per minute for LLM calls (default 0 = unlimited)
+- GITHUB_RPM: requests per minute for GitHub tool calls (default 0 = unlimited)
+- RATE_LIMIT_MAX_RETRIES: retries per call before giving up (default 6)
+- RATE_LIMIT_BACKOFF_BASE / RATE_LIMIT_BACKOFF_CAP: backoff seconds (default 1 / 60)
+"""
+
+import email.utils
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Mapping, Optional
+import httpx
+from github_cache import READ_MODES, error_status, wrapper_error
+from tracing import annotate
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until `tokens` are available and take them.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
+
+
+_limiters: dict[str, Optional[TokenBucket]] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_rate_limit(provider: str, requests_per_minute: float) -> None:
+    """
+    Set the shared limit for a provider ("openai" or "github"); 0 removes it.
+    """
+    with _limiters_lock:
+        if requests_per_minute and requests_per_minute > 0:
+            rate = requests_per_minute / 60.0
+            _limiters[provider] = TokenBucket(rate=rate, capacity=max(1.0, min(rate * 10, requests_per_minute)))
+        else:
+            _limiters[provider] = None
+
+
+def get_rate_limiter(provider: str) -> Optional[TokenBucket]:
+    """
+    Get the shared limiter for a provider, configured from <PROVIDER>_RPM on first use.
+    """
+    with _limiters_lock:
+        if provider in _limiters:
+            return _limiters[provider]
+    configure_rate_limit(provider, float(os.getenv(f"{provider.upper()}_RPM", "0")))
+    return _limiters[provider]
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """
+    Parse durations like "20ms", "1.5s" or "6m0s" (OpenAI reset headers) into seconds.
+    """
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * units[unit] for number, unit in parts)
+
+
+def _retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def quota_from_headers(headers: Mapping[str, str]) -> tuple[Optional[int], Optional[int], Optional[float]]:
+    """
+    Read (remaining, limit, seconds until reset) from OpenAI or GitHub response headers.
+    """
+    headers = {key.lower(): value for key, value in headers.items()}
+    try:
+        if "x-ratelimit-remaining-requests" in headers:
+            remaining = int(headers["x-ratelimit-remaining-requests"])
+            limit = int(headers.get("x-ratelimit-limit-requests", 0)) or None
+            reset = _parse_duration(headers.get("x-ratelimit-reset-requests", ""))
+            return remaining, limit, reset
+        if "x-ratelimit-remaining" in headers:
+            remaining = int(headers["x-ratelimit-remaining"])
+            limit = int(headers.get("x-ratelimit-limit", 0)) or None
+            reset_at = headers.get("x-ratelimit-reset")
+            reset = max(0.0, float(reset_at) - time.time()) if reset_at else None
+            return remaining, limit, reset
+    except ValueError:
+        pass
+    return None, None, None
+
+
+# Connection failures reported in the text of a wrapper error (requests/urllib3 messages)
+_CONNECTION_ERROR = re.compile(r"ConnectionPool|Connection (?:aborted|refused|reset)|timed out", re.IGNORECASE)
+
+
+class ToolResultError(Exception):
+    """
+    A GitHub tool error that the toolkit wrapper returned as its result, raised so the governor can retry it.
+    """
+
+    def __init__(self, result: str):
+        super().__init__(result)
+        self.result = result
+        self.status = error_status(result)
+
+
+def classify_error(error: BaseException) -> tuple[bool, bool, Optional[float]]:
+    """
+    Decide whether a failed call should be retried.
+
+    Returns:
+        (retryable, rate_limited, retry_after seconds or None)
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    headers = getattr(error, "headers", None) or getattr(response, "headers", None) or {}
+    headers = {str(key).lower(): str(value) for key, value in dict(headers).items()}
+    retry_after = _retry_after(headers)
+
+    name = type(error).__name__
+    remaining, _, _ = quota_from_headers(headers)
+    if status == 429 or name in ("RateLimitError", "RateLimitExceededException"):
+        return True, True, retry_after
+    if status == 403 and (retry_after is not None or remaining == 0 or "rate limit" in str(error).lower()):
+        # GitHub reports primary and secondary rate limits as 403
+        return True, True, retry_after
+    if isinstance(status, int) and status >= 500:
+        return True, False, retry_after
+    if name in ("APIConnectionError", "APITimeoutError", "Timeout", "ServiceUnavailableError") or isinstance(
+        error, (httpx.TransportError, ConnectionError, TimeoutError)
+    ):
+        return True, False, None
+    if isinstance(error, ToolResultError) and status is None and _CONNECTION_ERROR.search(error.result):
+        return True, False, None
+    return False, False, None
+
+
+class RateGovernor:
+    """
+    Admission, quota tracking and retries for one provider.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        max_retries: int = 6,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 60.0,
+        low_water: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None
+    ):
+        self.provider = provider
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.low_water = low_water
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.retries = 0
+        self.rate_limited = 0
+        self._blocked_until = 0.0
+        self._interval = 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, headers: Mapping[str, str], status: Optional[int] = None) -> None:
+        """
+        Update the quota from a response's headers.
+        """
+        remaining, limit, reset = quota_from_headers(headers)
+        retry_after = _retry_after({key.lower(): value for key, value in headers.items()})
+        now = self.clock()
+        with self._lock:
+            if status == 429 or (remaining == 0 and reset):
+                self._blocked_until = max(self._blocked_until, now + (retry_after or reset or 0.0))
+            if remaining is None or not reset:
+                return
+            if limit and remaining > limit * self.low_water:
+                self._interval = 0.0
+            else:
+                # Spread what is left of the quota evenly until it resets
+                self._interval = reset / max(remaining, 1)
+
+    def block(self, seconds: float) -> None:
+        """
+        Make every caller of this provider wait at least `seconds` before its next request.
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self.clock() + seconds)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Full-jitter exponential backoff delay for a retry attempt (0-based).
+        """
+        return self.rng.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def admit(self) -> float:
+        """
+        Block until a request may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        with self._lock:
+            now = self.clock()
+            delay = max(0.0, self._blocked_until - now)
+            if self._interval:
+                slot = max(now + delay, self._next_slot)
+                self._next_slot = slot + self._interval
+                delay = slot - now
+        if delay > 0:
+            self.sleep(delay)
+            waited += delay
+        limiter = get_rate_limiter(self.provider)
+        if limiter is not None:
+            waited += limiter.acquire()
+        return waited
+
+    def call(self, function: Callable[[], Any]) -> Any:
+        """
+        Run a request under admission control, retrying rate-limited and transient failures.
+        """
+        attempt = 0
+        while True:
+            annotate(wait_s=self.admit())
+            try:
+                return function()
+            except Exception as e:
+                retryable, rate_limited, retry_after = classify_error(e)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = retry_after if retry_after is not None else self.backoff(attempt)
+                with self._lock:
+                    self.retries += 1
+                    self.rate_limited += int(rate_limited)
+                if rate_limited:
+                    self.block(delay)
+                else:
+                    self.sleep(delay)
+                annotate(retries=1)
+                attempt += 1
+
+
+_governors: dict[str, RateGovernor] = {}
+
+
+def get_governor(provider: str) -> RateGovernor:
+    """
+    Get the shared governor of a provider ("openai" or "github").
+    """
+    with _limiters_lock:
+        governor = _governors.get(provider)
+        if governor is None:
+            governor = RateGovernor(
+                provider,
+                max_retries=int(os.getenv("RATE_LIMIT_MAX_RETRIES", "6")),
+                backoff_base=float(os.getenv("RATE_LIMIT_BACKOFF_BASE", "1")),
+                backoff_cap=float(os.getenv("RATE_LIMIT_BACKOFF_CAP", "60")),
+            )
+            _governors[provider] = governor
+        return governor
+
+
+class GovernedTransport(httpx.BaseTransport):
+    """
+    httpx transport that reports every response's rate-limit headers to a governor.
+    """
+
+    def __init__(self, provider: str, transport: Optional[httpx.BaseTransport] = None):
+        self.provider = provider
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self.transport.handle_request(request)
+        get_governor(self.provider).observe(response.headers, response.status_code)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+def _observe_github(provider) -> None:
+    # PyGithub keeps the quota of the latest response on its requester
+    wrapper = getattr(provider, "_wrapper", None)
+    requester = getattr(getattr(wrapper, "github_repo_instance", None), "_requester", None)
+    remaining, limit = getattr(requester, "rate_limiting", (-1, -1))
+    reset_at = getattr(requester, "rate_limiting_resettime", 0)
+    if remaining >= 0 and reset_at:
+        get_governor("github").observe({
+            "x-ratelimit-remaining": str(remaining),
+            "x-ratelimit-limit": str(limit),
+            "x-ratelimit-reset": str(reset_at),
+        })
+
+
+def llm_rate_limit_middleware(llm, messages: list[dict], call_next) -> str:
+    """
+    agents.py LLM middleware that admits, paces and retries calls through the OpenAI governor.
+    """
+    return get_governor("openai").call(lambda: call_next(messages))
+
+
+def tool_rate_limit_middleware(provider, mode: str, instructions: str, call_next) -> str:
+    """
+    tools.py middleware that admits, paces and retries calls through the GitHub governor.
+
+    Registered after the response cache, so cache hits do not consume budget.
+    Errors the toolkit wrapper returns as results (see github_cache.wrapper_error)
+    are retried like raised ones: rate limits for every operation, transient
+    failures only for reads, since a write may have gone through. When retries
+    run out, the wrapper's error result is returned as before.
+    """
+    def attempt() -> str:
+        result = call_next(mode, instructions)
+        if wrapper_error(mode, result):
+            error = ToolResultError(result)
+            retryable, rate_limited, _ = classify_error(error)
+            if rate_limited or (retryable and mode in READ_MODES):
+                raise error
+        return result
+
+    try:
+        return get_governor("github").call(attempt)
+    except ToolResultError as e:
+        return e.result
+    finally:
+        _observe_github(provider)
@@ -0,0 +1,205 @@
+"""
+Result Store
+This module keeps the results returned by run_it_squad small in memory.
+
+A CrewAI CrewOutput holds every task output in full, together with the task
+descriptions and expected outputs, and long-lived callers (the service's job
+history, batch workers) keep these objects around. run_it_squad returns a
+RunResult instead: task outputs larger than a threshold are written once to a
+per-run file and read back through a memory map only when accessed, so a
+retained result costs a few hundred bytes plus its small outputs.
+
+The store is opt-in, since callers then get a RunResult instead of a
+CrewOutput. RunResult has the CrewOutput attributes (raw, pydantic, json_dict,
+tasks_output, token_usage, to_dict(), str()) and its TaskResult entries those
+callers use on TaskOutput (name, agent, raw, str()).
+A run's file is deleted once neither its RunResult nor any of its TaskResult
+entries is referenced any more.
+
+Configuration (environment):
+- RESULT_STORE: "on" to return RunResult handles (default off: the CrewOutput unchanged)
+- RESULT_STORE_DIR: directory of the spilled outputs (default .cache/results)
+- RESULT_SPILL_BYTES: outputs larger than this many bytes are spilled (default 16384)
+"""
+
+import mmap
+import os
+import uuid
+import weakref
+from typing import Any, Optional, Union
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class _SpillFile:
+    """
+    Owner of a run file, shared by every SpilledText stored in it; the file is removed when it is collected.
+    """
+
+    __slots__ = ("path", "__weakref__")
+
+    def __init__(self, path: str):
+        self.path = path
+        weakref.finalize(self, _remove, path)
+
+
+class SpilledText:
+    """
+    Lazy handle to a UTF-8 text stored in a result file.
+    """
+
+    __slots__ = ("file", "offset", "length")
+
+    def __init__(self, file: _SpillFile, offset: int, length: int):
+        self.file = file
+        self.offset = offset
+        self.length = length
+
+    @property
+    def path(self) -> str:
+        return self.file.path
+
+    def read(self) -> str:
+        if not self.length:
+            return ""
+        with open(self.file.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[self.offset:self.offset + self.length].decode("utf-8")
+
+
+def _text(value: Union[str, SpilledText]) -> str:
+    return value.read() if isinstance(value, SpilledText) else value
+
+
+class TaskResult:
+    """
+    Output of one task of a RunResult; raw is read from disk on access if it was spilled.
+    """
+
+    __slots__ = ("name", "agent", "_raw")
+
+    def __init__(self, name: Optional[str], agent: Optional[str], raw: Union[str, SpilledText]):
+        self.name = name
+        self.agent = agent
+        self._raw = raw
+
+    @property
+    def raw(self) -> str:
+        return _text(self._raw)
+
+    def __str__(self) -> str:
+        return self.raw
+
+
+class RunResult:
+    """
+    Lightweight result of a run with lazy access to its spilled outputs.
+    """
+
+    __slots__ = ("tasks_output", "token_usage", "pydantic", "json_dict", "path", "_raw")
+
+    def __init__(
+        self,
+        raw: Union[str, SpilledText],
+        tasks_output: list[TaskResult],
+        token_usage: Any = None,
+        path: Optional[str] = None,
+        pydantic: Any = None,
+        json_dict: Optional[dict] = None
+    ):
+        self._raw = raw
+        self.tasks_output = tasks_output
+        self.token_usage = token_usage
+        self.path = path
+        self.pydantic = pydantic
+        self.json_dict = json_dict
+
+    @property
+    def raw(self) -> str:
+        return _text(self._raw)
+
+    def to_dict(self) -> dict:
+        """
+        JSON output of the final task, like CrewOutput.to_dict().
+        """
+        if self.json_dict:
+            return dict(self.json_dict)
+        if self.pydantic is not None:
+            return self.pydantic.model_dump()
+        return {}
+
+    def __str__(self) -> str:
+        return self.raw
+
+
+class ResultStore:
+    """
+    Spills the large outputs of finished runs to files and returns RunResult handles.
+
+    Args:
+        directory: Where run files are written
+        spill_bytes: Outputs larger than this are spilled; smaller ones stay in memory
+    """
+
+    def __init__(self, directory: Optional[str] = None, spill_bytes: Optional[int] = None):
+        self.directory = directory or os.getenv("RESULT_STORE_DIR", os.path.join(".cache", "results"))
+        self.spill_bytes = spill_bytes if spill_bytes is not None else int(os.getenv("RESULT_SPILL_BYTES", "16384"))
+
+    def compact(self, result: Any) -> RunResult:
+        """
+        Build the RunResult of a CrewOutput, writing its large outputs to one file.
+        """
+        path = os.path.join(self.directory, f"{uuid.uuid4().hex}.out")
+        spilled: dict[str, SpilledText] = {}
+        file = None
+        owner = None
+        offset = 0
+
+        def keep(text: str) -> Union[str, SpilledText]:
+            nonlocal file, owner, offset
+            data = text.encode("utf-8")
+            if len(data) <= self.spill_bytes:
+                return text
+            # The final output usually repeats the last task's output; store it once
+            if text in spilled:
+                return spilled[text]
+            if file is None:
+                os.makedirs(self.directory, exist_ok=True)
+                file = open(path, "wb")
+                owner = _SpillFile(path)
+            file.write(data)
+            spilled[text] = SpilledText(owner, offset, len(data))
+            offset += len(data)
+            return spilled[text]
+
+        try:
+            tasks = [
+                TaskResult(getattr(output, "name", None), getattr(output, "agent", None), keep(output.raw or ""))
+                for output in result.tasks_output
+            ]
+            raw = keep(result.raw or "")
+        finally:
+            if file is not None:
+                file.close()
+
+        return RunResult(
+            raw,
+            tasks,
+            getattr(result, "token_usage", None),
+            path if file is not None else None,
+            pydantic=getattr(result, "pydantic", None),
+            json_dict=getattr(result, "json_dict", None),
+        )
+
+
+def get_default_store() -> Optional[ResultStore]:
+    """
+    Build the result store from the environment, or None unless RESULT_STORE is on.
+    """
+    if os.getenv("RESULT_STORE", "off").lower() in ("", "off", "0", "false"):
+        return None
+    return ResultStore()
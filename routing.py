@@ -0,0 +1,206 @@
+"""
+Model Routing
+This module decides which model each agent LLM call uses.
+
+Every role gets its own route (model, temperature, max tokens, timeout), and a
+task can override any of those fields for the calls made while it runs. By
+default every role uses OPENAI_MODEL_NAME. With OPENAI_FAST_MODEL_NAME set,
+the Project Manager and the Tester use that model instead, since planning and
+test reports do not need the slowest one.
+
+A route can name a fallback model and a latency SLO; LLM_LATENCY_SLO gives the
+Tech Lead and the Developer one, with the fast model as fallback. The latency of each model
+is tracked as a moving average of its calls; while the average of a route's
+model is over the SLO, its calls go to the fallback model instead, and after a
+cooldown the primary model is tried again.
+
+Configuration (environment):
+- OPENAI_FAST_MODEL_NAME: model for the cheap steps and fallbacks (default: none,
+  OPENAI_MODEL_NAME everywhere; fallbacks use gpt-4o-mini)
+- LLM_LATENCY_SLO: seconds per call before falling back to the fast model (default: none, no fallback)
+- MODEL_ROUTES: JSON file overriding the routes, e.g.
+  {"roles": {"tester": {"model": "gpt-4o", "max_tokens": 2000}},
+   "tasks": {"testing": {"temperature": 0.2}}}
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, fields, replace
+from typing import Callable, Optional
+from tracing import current_task
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    model: str
+    temperature: float = 0.7
+    max_tokens: Optional[int] = None
+    timeout: Optional[float] = None
+    fallback_model: Optional[str] = None
+    latency_slo_s: Optional[float] = None
+
+
+def default_routes() -> dict[str, ModelRoute]:
+    """
+    Routes per role key (see agents.AGENT_FACTORIES) built from the environment.
+    """
+    model = os.getenv("OPENAI_MODEL_NAME", "gpt-4")
+    fast_model = os.getenv("OPENAI_FAST_MODEL_NAME")
+    slo = float(os.getenv("LLM_LATENCY_SLO") or 0) or None
+    fallback = fast_model or "gpt-4o-mini"
+    if not slo or fallback == model:
+        fallback = slo = None
+    return {
+        "project_manager": ModelRoute(model=fast_model or model, temperature=0.7),
+        "tech_lead": ModelRoute(model=model, temperature=0.7, fallback_model=fallback, latency_slo_s=slo),
+        "developer": ModelRoute(model=model, temperature=0.7, fallback_model=fallback, latency_slo_s=slo),
+        "tester": ModelRoute(model=fast_model or model, temperature=0.7),
+    }
+
+
+def _route_overrides(values: dict) -> dict:
+    known = {f.name for f in fields(ModelRoute)}
+    unknown = set(values) - known
+    if unknown:
+        raise ValueError(f"Unknown model route fields: {sorted(unknown)}. Expected some of {sorted(known)}")
+    return dict(values)
+
+
+class LatencyMonitor:
+    """
+    Moving average of call latency per model.
+    """
+
+    def __init__(self, alpha: float = 0.3, cooldown: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.alpha = alpha
+        self.cooldown = cooldown
+        self.clock = clock
+        self._averages: dict[str, float] = {}
+        self._degraded_until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float) -> None:
+        with self._lock:
+            average = self._averages.get(model)
+            self._averages[model] = seconds if average is None else average + self.alpha * (seconds - average)
+
+    def average(self, model: str) -> Optional[float]:
+        return self._averages.get(model)
+
+    def is_over(self, model: str, slo: float) -> bool:
+        """
+        Whether the model is over its SLO. A model that went over stays degraded for the
+        cooldown, then its average is reset so the next call probes it again.
+        """
+        with self._lock:
+            now = self.clock()
+            until = self._degraded_until.get(model)
+            if until is not None:
+                if now < until:
+                    return True
+                del self._degraded_until[model]
+                self._averages.pop(model, None)
+                return False
+            average = self._averages.get(model)
+            if average is not None and average > slo:
+                self._degraded_until[model] = now + self.cooldown
+                return True
+            return False
+
+
+class ModelRouter:
+    """
+    Resolves the route of a call from the agent role and the task being run.
+    """
+
+    def __init__(
+        self,
+        roles: Optional[dict[str, ModelRoute]] = None,
+        tasks: Optional[dict[str, dict]] = None,
+        monitor: Optional[LatencyMonitor] = None
+    ):
+        self.roles = roles if roles is not None else default_routes()
+        self.tasks = tasks or {}
+        self.monitor = monitor or LatencyMonitor()
+
+    def route(self, role: Optional[str], task: Optional[str] = None) -> ModelRoute:
+        """
+        Configured route of a role, with the task's overrides applied.
+        """
+        route = self.roles.get(role) if role else None
+        if route is None:
+            route = ModelRoute(model=os.getenv("OPENAI_MODEL_NAME", "gpt-4"))
+        if task and task in self.tasks:
+            route = replace(route, **self.tasks[task])
+        return route
+
+    def select(self, role: Optional[str], task: Optional[str] = None) -> ModelRoute:
+        """
+        Route to use right now: the configured one, or its fallback while the model is over its SLO.
+        """
+        route = self.route(role, task)
+        if route.fallback_model and route.latency_slo_s and self.monitor.is_over(route.model, route.latency_slo_s):
+            return replace(route, model=route.fallback_model, fallback_model=None)
+        return route
+
+
+def load_router(path: Optional[str] = None) -> ModelRouter:
+    """
+    Build a router from the defaults and an optional MODEL_ROUTES JSON file.
+    """
+    path = path if path is not None else os.getenv("MODEL_ROUTES")
+    roles = default_routes()
+    tasks: dict[str, dict] = {}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        for role, values in config.get("roles", {}).items():
+            base = roles.get(role) or ModelRoute(model=os.getenv("OPENAI_MODEL_NAME", "gpt-4"))
+            roles[role] = replace(base, **_route_overrides(values))
+        tasks = {task: _route_overrides(values) for task, values in config.get("tasks", {}).items()}
+    return ModelRouter(roles=roles, tasks=tasks)
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ModelRouter:
+    """
+    Get the process-wide router, loading it on first use.
+    """
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = load_router()
+        return _router
+
+
+def set_router(router: Optional[ModelRouter]) -> None:
+    """
+    Replace the process-wide router (None reloads it from the environment on next use).
+    """
+    global _router
+    with _router_lock:
+        _router = router
+
+
+def select_route(role: Optional[str]) -> ModelRoute:
+    """
+    Route for a call made now by the given role, in the current task.
+    """
+    return get_router().select(role, current_task.get())
+
+
+def latency_middleware(llm, messages: list[dict], call_next) -> str:
+    """
+    agents.py LLM middleware that feeds model latency to the router's monitor.
+
+    Registered innermost, so cache hits and rate-limit waits are not counted.
+    """
+    started = time.perf_counter()
+    result = call_next(messages)
+    get_router().monitor.record(llm.model, time.perf_counter() - started)
+    return result
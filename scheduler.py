@@ -0,0 +1,131 @@
+"""
+Task Scheduler
+This module runs the squad's tasks as a dependency graph instead of a fixed sequence.
+
+Each task declares which earlier task outputs it consumes (see
+tasks.TASK_DEPENDENCIES). A task starts as soon as all of its inputs are
+available, and independent tasks run concurrently in worker threads under a
+concurrency limit, so the wall-clock time of a run approaches the critical path
+instead of the sum of all tasks.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+
+# Same separator CrewAI uses when it aggregates task outputs into context
+CONTEXT_SEPARATOR = "\n\n----------\n\n"
+
+
+@dataclass
+class TaskNode:
+    """
+    A task in the graph together with the names of the tasks it consumes.
+    """
+    name: str
+    task: Task
+    depends_on: tuple[str, ...] = ()
+
+
+def topological_order(nodes: dict[str, TaskNode]) -> list[str]:
+    """
+    Order node names so every task comes after its dependencies.
+
+    Raises:
+        ValueError: If a dependency is unknown or the graph has a cycle
+    """
+    order: list[str] = []
+    state: dict[str, str] = {}
+
+    def visit(name: str, path: tuple[str, ...]) -> None:
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Task dependency cycle: {' -> '.join(path + (name,))}")
+        if name not in nodes:
+            raise ValueError(f"Unknown task dependency {name!r} (required by {path[-1]!r})")
+        state[name] = "visiting"
+        for dependency in nodes[name].depends_on:
+            visit(dependency, path + (name,))
+        state[name] = "done"
+        order.append(name)
+
+    for name in nodes:
+        visit(name, ())
+    return order
+
+
+def build_context(node: TaskNode, outputs: dict[str, TaskOutput]) -> str:
+    """
+    Join the raw outputs of a node's dependencies into its context string.
+    """
+    return CONTEXT_SEPARATOR.join(outputs[dependency].raw for dependency in node.depends_on)
+
+
+def execute_node(node: TaskNode, context: str) -> TaskOutput:
+    """
+    Run a task synchronously with its agent and the given context.
+    """
+    return node.task.execute_sync(context=context or None)
+
+
+async def run_task_graph(
+    nodes: dict[str, TaskNode],
+    max_concurrency: int = 2,
+    execute: Callable[[TaskNode, str], TaskOutput] = execute_node,
+    context_builder: Callable[[TaskNode, dict[str, TaskOutput]], str] = build_context,
+) -> dict[str, TaskOutput]:
+    """
+    Run the task graph, starting each task as soon as its inputs are ready.
+
+    Args:
+        nodes: Task nodes keyed by name
+        max_concurrency: Maximum number of tasks executing at the same time
+        execute: Function that runs one node (in a worker thread) with its context
+        context_builder: Function that builds a node's context from finished outputs
+
+    Returns:
+        Task outputs keyed by node name, in the order of `nodes`
+    """
+    order = topological_order(nodes)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    outputs: dict[str, TaskOutput] = {}
+    running: dict[str, "asyncio.Task[Any]"] = {}
+
+    async def run(node: TaskNode) -> None:
+        for dependency in node.depends_on:
+            await running[dependency]
+        async with semaphore:
+            context = context_builder(node, outputs)
+            outputs[node.name] = await asyncio.to_thread(execute, node, context)
+
+    for name in order:
+        running[name] = asyncio.ensure_future(run(nodes[name]))
+
+    try:
+        await asyncio.gather(*running.values())
+    except BaseException:
+        for pending in running.values():
+            pending.cancel()
+        raise
+
+    return {name: outputs[name] for name in nodes}
+
+
+def run_task_graph_sync(nodes: dict[str, TaskNode], max_concurrency: int = 2, **kwargs: Any) -> dict[str, TaskOutput]:
+    """
+    Blocking wrapper around run_task_graph for callers without an event loop.
+    """
+    return asyncio.run(run_task_graph(nodes, max_concurrency=max_concurrency, **kwargs))
+
+
+def nodes_from_tasks(tasks: dict[str, Task], dependencies: dict[str, tuple[str, ...]]) -> dict[str, TaskNode]:
+    """
+    Build graph nodes from named tasks and a dependency table.
+    """
+    return {
+        name: TaskNode(name=name, task=task, depends_on=tuple(dependencies.get(name, ())))
+        for name, task in tasks.items()
+    }
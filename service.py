@@ -0,0 +1,331 @@
+"""
+Squad Service
+This module runs the IT squad as a long-lived local service.
+
+The process imports the framework, builds the agents, LLM clients and GitHub
+tools once, and then serves project descriptions over a local HTTP API (TCP or
+Unix socket). Jobs are queued and run by a fixed number of workers, each with
+its own warm squad from agents.checkout_squad, so a request only pays for its
+LLM and GitHub calls. When the queue is full, new jobs are rejected with
+429 Too Many Requests instead of piling up in memory. Stopping the service
+lets the running jobs finish and cancels the queued ones, without waiting for
+room in the queue.
+
+API:
+    POST /jobs        {"project_description": "...", "parallel": false, "repository": "owner/repo"}
+                      -> 202 {"id": "...", "status": "queued"} (429 when the queue is full)
+    GET  /jobs/<id>   -> job status, with "result" once done or "error" if it failed or was cancelled
+    GET  /health      -> queue and worker counts
+
+Usage:
+    python main.py --serve --port 8765 --concurrency 2
+    python service.py --socket /tmp/it-squad.sock
+"""
+
+import argparse
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from contextlib import ExitStack
+from dataclasses import dataclass, field, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while the service queue is full."""
+
+
+@dataclass
+class Job:
+    id: str
+    project_description: str
+    parallel: bool = False
+    repository: Optional[str] = None
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # RunResult of the run (see results.py); serialized only when a client reads it
+    result: Any = None
+    error: Optional[str] = None
+
+    def to_dict(self, include_result: bool = True) -> dict:
+        from batch import serialize_result
+
+        data = {item.name: getattr(self, item.name) for item in fields(self)}
+        del data["project_description"]
+        if include_result:
+            data["result"] = serialize_result(self.result) if self.result is not None else None
+        else:
+            del data["result"]
+        return data
+
+
+class SquadService:
+    """
+    Bounded job queue served by worker threads with warm squads.
+
+    Args:
+        concurrency: Number of jobs running at the same time
+        max_queue: Jobs waiting beyond the running ones before submissions are rejected
+        max_history: Finished jobs kept for status polling
+    """
+
+    def __init__(self, concurrency: int = 2, max_queue: int = 16, max_history: int = 1000):
+        self.concurrency = max(1, concurrency)
+        self.max_history = max_history
+        self._queue: "queue.Queue[Job]" = queue.Queue(maxsize=max_queue)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers: list[threading.Thread] = []
+        self._stopping = threading.Event()
+
+    def warm(self) -> None:
+        """
+        Import the framework and build one squad per worker ahead of the first job.
+        """
+        from agents import checkout_squad
+        from tools import warm_github_tools
+
+        warm_github_tools()
+        with ExitStack() as stack:
+            for _ in range(self.concurrency):
+                stack.enter_context(checkout_squad())
+
+    def start(self) -> None:
+        self._stopping.clear()
+        for index in range(self.concurrency):
+            worker = threading.Thread(target=self._work, name=f"squad-service-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self) -> None:
+        """
+        Wait for the running jobs and cancel the queued ones.
+
+        A flag rather than sentinels in the queue stops the workers, so stopping
+        never blocks on a full queue.
+        """
+        self._stopping.set()
+        for worker in self._workers:
+            worker.join()
+        self._workers.clear()
+        while True:
+            try:
+                self._cancel(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+    def submit(self, project_description: str, parallel: bool = False, repository: Optional[str] = None) -> Job:
+        """
+        Queue a job.
+
+        Raises:
+            QueueFull: If max_queue jobs are already waiting or the service is stopping
+        """
+        if self._stopping.is_set():
+            raise QueueFull("service is stopping")
+        job = Job(
+            id=uuid.uuid4().hex[:12],
+            project_description=project_description,
+            parallel=parallel,
+            repository=repository
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise QueueFull(f"{self._queue.maxsize} jobs already waiting")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def health(self) -> dict:
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job.status == "running")
+        return {
+            "status": "ok",
+            "workers": len(self._workers),
+            "running": running,
+            "queued": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+        }
+
+    def _work(self) -> None:
+        from agents import checkout_squad
+        from crew import run_it_squad
+
+        while not self._stopping.is_set():
+            try:
+                # Short waits, so an idle worker notices stop() without a sentinel
+                job = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if self._stopping.is_set():
+                self._cancel(job)
+                return
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                with checkout_squad() as agents:
+                    result = run_it_squad(
+                        job.project_description, parallel=job.parallel, agents=agents, repository=job.repository
+                    )
+                job.result = result
+                job.status = "done"
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = "failed"
+                traceback.print_exc()
+            job.finished_at = time.time()
+            self._forget_old_jobs()
+
+    def _cancel(self, job: Job) -> None:
+        job.status = "cancelled"
+        job.error = "Service stopped before the job started"
+        job.finished_at = time.time()
+
+    def _forget_old_jobs(self) -> None:
+        with self._lock:
+            finished = [
+                job_id for job_id, job in self._jobs.items() if job.status in ("done", "failed", "cancelled")
+            ]
+            for job_id in finished[:max(0, len(finished) - self.max_history)]:
+                del self._jobs[job_id]
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API over the SquadService attached to the server.
+    """
+
+    server_version = "ITSquad/1.0"
+
+    def _send(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        service: SquadService = self.server.service
+        if self.path == "/health":
+            self._send(200, service.health())
+        elif self.path.startswith("/jobs/"):
+            job = service.get(self.path[len("/jobs/"):])
+            if job is None:
+                self._send(404, {"error": "job not found"})
+            else:
+                self._send(200, job.to_dict())
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        service: SquadService = self.server.service
+        if self.path != "/jobs":
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body: Any = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            self._send(400, {"error": "invalid JSON body"})
+            return
+        if not isinstance(body, dict) or not body.get("project_description"):
+            self._send(400, {"error": "project_description is required"})
+            return
+        try:
+            job = service.submit(
+                body["project_description"],
+                parallel=bool(body.get("parallel", False)),
+                repository=body.get("repository") or None
+            )
+        except QueueFull as e:
+            self._send(429, {"error": str(e)}, headers={"Retry-After": "30"})
+            return
+        self._send(202, job.to_dict(include_result=False), headers={"Location": f"/jobs/{job.id}"})
+
+    def address_string(self) -> str:
+        # Unix socket peers have no host address
+        return self.client_address[0] if self.client_address else "unix"
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self) -> None:
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+        self.server_name, self.server_port = "localhost", 0
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[str] = None,
+    concurrency: int = 2,
+    max_queue: int = 16
+) -> None:
+    """
+    Warm up the squad and serve the job API until interrupted.
+    """
+    service = SquadService(concurrency=concurrency, max_queue=max_queue)
+    print("🔥 Preparando agentes e ferramentas...")
+    service.warm()
+    service.start()
+
+    if socket_path:
+        server = ThreadingUnixHTTPServer(socket_path, ServiceRequestHandler)
+        address = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+        address = f"http://{host}:{port}"
+    server.service = service
+    print(f"🚀 Serviço do squad em {address} ({concurrency} workers, fila de {max_queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve the IT squad over a local HTTP API.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--socket", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--concurrency", type=int, default=2, help="jobs running at the same time")
+    parser.add_argument("--queue-size", type=int, default=16, help="waiting jobs before new ones are rejected")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    from settings import load_settings
+    load_settings()
+    serve(args.host, args.port, args.socket, args.concurrency, args.queue_size)
+
+
+if __name__ == "__main__":
+    main()
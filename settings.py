@@ -0,0 +1,37 @@
+"""
+Settings
+This module loads the environment configuration once per process.
+
+It has no third-party imports besides python-dotenv, so entry points can read
+and check the configuration before the agent framework (crewai, langchain) is
+imported. Modules that read the environment at import time call
+load_settings() first; every call after the first is a no-op.
+"""
+
+import os
+import threading
+from typing import Optional
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_settings(dotenv_path: Optional[str] = None) -> None:
+    """
+    Load the .env file into the environment (variables already set take precedence).
+    """
+    global _loaded
+    with _lock:
+        if _loaded:
+            return
+        from dotenv import load_dotenv
+        load_dotenv(dotenv_path)
+        _loaded = True
+
+
+def missing_required() -> list[str]:
+    """
+    Names of the required settings that are not configured.
+    """
+    load_settings()
+    return [name for name in ("OPENAI_API_KEY",) if not os.getenv(name)]
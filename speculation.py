@@ -0,0 +1,183 @@
+"""
+Speculative Execution
+This module lets a task start before one of its inputs is ready.
+
+In the sequential flow the Tester waits for the Developer to finish, although
+most of its work (reviewing the repository, designing test cases for the
+components of the architecture) only needs the architecture. In speculative
+mode the testing task runs as a draft as soon as the architecture is done,
+alongside the implementation. The draft's GitHub writes (issues, comments,
+pull requests) are held back (see checkpoint.defer_side_effects), since they
+would be made against an unfinished implementation. When the implementation
+arrives, the Tester checks the draft against it in a single LLM call without
+tools:
+
+- if the draft still holds for the final implementation, it is kept as the
+  task output and its held writes are sent (a speculation hit)
+- otherwise the draft and its held writes are dropped and the testing task
+  runs again, with its tools and the implementation in its context (a miss),
+  so a miss costs as much as not speculating plus the draft
+
+If the awaited outputs are already final when the task starts (e.g. restored
+from a checkpoint), there is nothing to speculate on: the task runs normally
+with them in its context and is not counted in the hit rate. If a held write
+fails when it is sent, the task fails with the list of failed writes instead of
+being recorded as done. format_report() gives the hit rate.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+from crewai.tasks.task_output import TaskOutput
+from checkpoint import defer_side_effects, replay_side_effects
+from context import summarize_to_budget
+from scheduler import CONTEXT_SEPARATOR, TaskNode
+from streaming import emit
+
+# Tasks that may start early, and the inputs they start without
+SPECULATIVE_TASKS: dict[str, tuple[str, ...]] = {
+    "testing": ("implementation",),
+}
+
+KEEP_ANSWER = "MANTER"
+
+RECONCILE_PROMPT = """Você escreveu o relatório de testes abaixo antes de a implementação terminar.
+
+Relatório preliminar:
+{draft}
+
+Implementação final:
+{inputs}
+
+Se o relatório continua válido para a implementação final, responda apenas {keep}.
+Caso contrário, responda em uma frase o que deixou de valer."""
+
+
+def speculative_dependencies(
+    dependencies: dict[str, tuple[str, ...]],
+    tasks: Optional[dict[str, tuple[str, ...]]] = None
+) -> dict[str, tuple[str, ...]]:
+    """
+    Drop the awaited inputs of the speculative tasks from a dependency table.
+    """
+    tasks = SPECULATIVE_TASKS if tasks is None else tasks
+    return {
+        name: tuple(inputs) if name not in tasks else tuple(i for i in inputs if i not in tasks[name])
+        for name, inputs in dependencies.items()
+    }
+
+
+@dataclass
+class SpeculationStats:
+    task: str
+    kept: bool
+    reconciled: bool
+    draft_seconds: float
+    overlap_seconds: float
+
+
+class Speculation:
+    """
+    Runs speculative tasks as drafts and reconciles them when their inputs arrive.
+
+    Args:
+        tasks: Speculative task names and the inputs they start without
+        max_context_tokens: Token budget of the awaited outputs in the reconcile call
+    """
+
+    def __init__(self, tasks: Optional[dict[str, tuple[str, ...]]] = None, max_context_tokens: int = 2000):
+        self.tasks = SPECULATIVE_TASKS if tasks is None else tasks
+        self.max_context_tokens = max_context_tokens
+        self.stats: dict[str, SpeculationStats] = {}
+        self._outputs: dict[str, TaskOutput] = {}
+        self._errors: dict[str, BaseException] = {}
+        self._finished_at: dict[str, float] = {}
+        self._done: dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def _event(self, name: str) -> threading.Event:
+        with self._lock:
+            return self._done.setdefault(name, threading.Event())
+
+    def publish(self, name: str, output: TaskOutput) -> None:
+        """
+        Make a finished task's output available to the drafts waiting for it.
+        """
+        self._outputs[name] = output
+        self._finished_at[name] = time.perf_counter()
+        self._event(name).set()
+
+    def fail(self, name: str, error: BaseException) -> None:
+        """
+        Release the drafts waiting for a task that failed.
+        """
+        self._errors[name] = error
+        self._event(name).set()
+
+    def execute(self, node: TaskNode, context: str, execute: Callable[[TaskNode, str], TaskOutput]) -> TaskOutput:
+        """
+        Run a node: directly, or as a draft plus reconciliation if it is speculative.
+        """
+        awaited = self.tasks.get(node.name)
+        if not awaited:
+            return execute(node, context)
+
+        if all(self._event(name).is_set() for name in awaited):
+            self._check_inputs(node, awaited)
+            inputs = self._inputs_context(awaited)
+            return execute(node, CONTEXT_SEPARATOR.join(part for part in (context, inputs) if part))
+
+        started = time.perf_counter()
+        with defer_side_effects() as held_writes:
+            draft = execute(node, context)
+        draft_finished = time.perf_counter()
+        for name in awaited:
+            self._event(name).wait()
+        self._check_inputs(node, awaited)
+        # Draft time spent while the awaited inputs were still running
+        inputs_finished = max(self._finished_at[name] for name in awaited)
+        overlap_seconds = max(0.0, min(draft_finished, inputs_finished) - started)
+
+        inputs = self._inputs_context(awaited)
+        kept = self._reconcile(node, draft, inputs)
+        with self._lock:
+            self.stats[node.name] = SpeculationStats(node.name, kept, True, draft_finished - started, overlap_seconds)
+        emit("speculation_reconciled", kept=kept)
+        if not kept:
+            return execute(node, CONTEXT_SEPARATOR.join(part for part in (context, inputs) if part))
+        failed = replay_side_effects(held_writes)
+        if failed:
+            details = "; ".join(f"{mode}: {error[:200]}" for mode, error in failed)
+            raise RuntimeError(
+                f"{len(failed)} of {len(held_writes)} held GitHub writes of {node.name!r} failed: {details}"
+            )
+        return draft
+
+    def _check_inputs(self, node: TaskNode, awaited: tuple[str, ...]) -> None:
+        for name in awaited:
+            if name in self._errors:
+                raise RuntimeError(f"Speculative task {node.name!r} lost its input {name!r}") from self._errors[name]
+
+    def _inputs_context(self, awaited: tuple[str, ...]) -> str:
+        share = self.max_context_tokens // len(awaited)
+        return CONTEXT_SEPARATOR.join(summarize_to_budget(self._outputs[name].raw, share) for name in awaited)
+
+    def _reconcile(self, node: TaskNode, draft: TaskOutput, inputs: str) -> bool:
+        """
+        Ask the task's agent, without tools, whether the draft holds for the awaited outputs.
+        """
+        prompt = RECONCILE_PROMPT.format(draft=draft.raw, inputs=inputs, keep=KEEP_ANSWER)
+        answer = node.task.agent.llm.call([{"role": "user", "content": prompt}]).strip()
+        return answer.strip(".\"'").upper() == KEEP_ANSWER
+
+    def format_report(self) -> str:
+        """
+        Printable hit rate and overlap of the speculative tasks.
+        """
+        if not self.stats:
+            return "nenhuma tarefa especulativa executada"
+        kept = sum(1 for stats in self.stats.values() if stats.kept)
+        overlap = sum(stats.overlap_seconds for stats in self.stats.values())
+        return (f"{kept}/{len(self.stats)} rascunhos aproveitados ({100 * kept / len(self.stats):.0f}% de acerto), "
+                f"{overlap:.1f}s de trabalho adiantado")
@@ -0,0 +1,210 @@
+"""
+Streaming
+This module streams structured events from a squad run as they happen.
+
+stream_it_squad() runs the crew in a background thread and yields events
+instead of returning only at the end:
+
+- run_started / run_finished / run_failed
+- task_started / task_finished (with the task output)
+- token: an LLM output delta (LLM calls stream while a consumer is attached;
+  completions replayed from the cache arrive as a single delta)
+- tool_call / tool_result: each GitHub tool invocation and the size of its result
+
+Events go through a bounded queue, so a slow consumer applies backpressure to
+the run instead of buffering output in memory. If the consumer stops iterating
+(closes the generator or breaks out of its loop), the run is cancelled: the
+LLM call in progress stops at its next delta, later LLM and tool calls raise
+StreamCancelled, and closing returns once the run thread has unwound. A tool
+call already in flight still finishes first.
+"""
+
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+from tracing import current_role, current_task
+
+EventSink = Callable[[dict], None]
+
+current_stream: contextvars.ContextVar[Optional[EventSink]] = contextvars.ContextVar("current_stream", default=None)
+_delta_sink: contextvars.ContextVar[Optional[Callable[[str], None]]] = contextvars.ContextVar("delta_sink", default=None)
+_cancelled: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar("stream_cancelled", default=None)
+
+_DONE = object()
+
+
+class StreamCancelled(Exception):
+    """
+    Raised inside a streamed run once its consumer has gone away, to stop the run early.
+    """
+    pass
+
+
+def _check_cancelled() -> None:
+    cancelled = _cancelled.get()
+    if cancelled is not None and cancelled.is_set():
+        raise StreamCancelled("stream consumer closed")
+
+
+def is_streaming() -> bool:
+    """
+    Whether the current run has an event consumer attached.
+    """
+    return current_stream.get() is not None
+
+
+def emit(event_type: str, **data: Any) -> None:
+    """
+    Send an event to the current run's consumer (no-op when not streaming).
+
+    Events are tagged with the task and role of the calling context.
+    """
+    sink = current_stream.get()
+    if sink is None:
+        return
+    event = {"type": event_type, "time": time.time(), "task": current_task.get(), "role": current_role.get()}
+    event.update(data)
+    sink(event)
+
+
+def current_delta_sink() -> Optional[Callable[[str], None]]:
+    """
+    Callback for the output deltas of the LLM call in progress, or None to call without streaming.
+    """
+    return _delta_sink.get()
+
+
+def llm_streaming_middleware(llm, messages: list[dict], call_next) -> str:
+    """
+    agents.py LLM middleware that asks for a streamed completion and emits its deltas.
+    """
+    if not is_streaming():
+        return call_next(messages)
+    _check_cancelled()
+    streamed = False
+
+    def on_delta(delta: str) -> None:
+        nonlocal streamed
+        _check_cancelled()
+        streamed = True
+        emit("token", delta=delta)
+
+    token = _delta_sink.set(on_delta)
+    try:
+        result = call_next(messages)
+    finally:
+        _delta_sink.reset(token)
+    if not streamed and result:
+        emit("token", delta=result)
+    return result
+
+
+def tool_streaming_middleware(provider, mode: str, instructions: str, call_next) -> str:
+    """
+    tools.py middleware that emits tool_call and tool_result events.
+    """
+    if not is_streaming():
+        return call_next(mode, instructions)
+    _check_cancelled()
+    emit("tool_call", tool=mode, input=instructions)
+    result = call_next(mode, instructions)
+    emit("tool_result", tool=mode, size=len(result), preview=result[:200])
+    return result
+
+
+def stream_it_squad(project_description: str, max_pending_events: int = 1000, **kwargs: Any) -> Iterator[dict]:
+    """
+    Run the IT squad and yield its events as they happen.
+
+    Args:
+        project_description: Description of the project to be executed
+        max_pending_events: Queue size; the run blocks while the consumer lags this far behind
+        **kwargs: Passed to crew.run_it_squad (parallel, max_concurrency, agents)
+
+    Yields:
+        Event dictionaries with at least "type", "time", "task" and "role"
+
+    Closing the generator early cancels the run and waits for its thread to stop.
+    """
+    from crew import run_it_squad
+
+    events: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending_events)
+    cancelled = threading.Event()
+
+    def sink(event: Any) -> None:
+        # Wait for room in short steps so a consumer that went away does not block the run
+        while not cancelled.is_set():
+            try:
+                events.put(event, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def worker() -> None:
+        current_stream.set(sink)
+        _cancelled.set(cancelled)
+        try:
+            result = run_it_squad(project_description, **kwargs)
+            emit("run_finished", output=getattr(result, "raw", str(result)))
+        except StreamCancelled:
+            pass
+        except Exception as e:
+            emit("run_failed", error=f"{type(e).__name__}: {e}")
+        finally:
+            sink(_DONE)
+
+    thread = threading.Thread(
+        target=contextvars.copy_context().run, args=(worker,), name="squad-stream", daemon=True
+    )
+    yield {"type": "run_started", "time": time.time(), "task": None, "role": None}
+    thread.start()
+    try:
+        while True:
+            event = events.get()
+            if event is _DONE:
+                break
+            yield event
+    finally:
+        # Also reached on GeneratorExit when the consumer stops early: cancel the run
+        # at its next LLM delta or call, then wait for the thread to unwind
+        cancelled.set()
+        thread.join()
+
+
+async def astream_it_squad(project_description: str, **kwargs: Any) -> AsyncIterator[dict]:
+    """
+    Async-iterator variant of stream_it_squad.
+    """
+    iterator = stream_it_squad(project_description, **kwargs)
+    try:
+        while True:
+            event = await asyncio.to_thread(next, iterator, _DONE)
+            if event is _DONE:
+                return
+            yield event
+    finally:
+        await asyncio.to_thread(iterator.close)
+
+
+def render_event(event: dict, write: Callable[[str], Any]) -> None:
+    """
+    Render an event as human-readable terminal output.
+    """
+    kind = event["type"]
+    if kind == "task_started":
+        write(f"\n\n▶️  {event['task']} ({event['role']})\n")
+    elif kind == "token":
+        write(event["delta"])
+    elif kind == "tool_call":
+        write(f"\n🔧 {event['tool']}({event['input'][:80]})\n")
+    elif kind == "tool_result":
+        write(f"   ↳ {event['size']} caracteres\n")
+    elif kind == "task_finished":
+        write(f"\n✔️  {event['task']} concluída\n")
+    elif kind == "run_finished":
+        write("\n\n✅ Squad de TI finalizado!\n")
+    elif kind == "run_failed":
+        write(f"\n\n❌ Erro: {event['error']}\n")
@@ -1,27 +1,27 @@
 """
 IT Squad Tasks Definition
 This module defines the tasks for the IT squad workflow.
+
+Descriptions put the static instructions first and the variable parts (project
+description, upstream context) last. The templates are compacted before the
+variable parts are inserted, so those keep their layout (see prompts.py).
 """
 
-from crewai import Task
-from agents import (
-    create_project_manager,
-    create_tech_lead,
-    create_developer,
-    create_tester
-)
+from typing import Optional
+from crewai import Agent, Task
+from agents import get_agent
+from prompts import fill_template
 
 
-def create_planning_task(project_description: str) -> Task:
+def create_planning_task(project_description: str, agent: Optional[Agent] = None) -> Task:
     """
     Creates the project planning task for the Project Manager.
     """
     return Task(
-        description=f"""
+        name="planning",
+        description=fill_template("""
         Analise os requisitos do projeto e crie um plano de ação detalhado.
         
-        Descrição do Projeto: {project_description}
-        
         Sua tarefa é:
         1. Analisar os requisitos do projeto
         2. Definir o escopo e objetivos claros
@@ -32,19 +32,22 @@ def create_planning_task(project_description: str) -> Task:
         
         Use as ferramentas do GitHub para verificar repositórios existentes,
         issues, pull requests e qualquer contexto relevante.
-        """,
-        agent=create_project_manager(),
+        
+        Descrição do Projeto: {project_description}
+        """, project_description=project_description),
+        agent=agent or get_agent("project_manager"),
         expected_output="Um plano de projeto detalhado com escopo, objetivos, tarefas priorizadas, "
                        "marcos, prazos e análise de riscos"
     )
 
 
-def create_architecture_task(planning_context: str = "") -> Task:
+def create_architecture_task(planning_context: str = "", agent: Optional[Agent] = None) -> Task:
     """
     Creates the technical architecture task for the Tech Lead.
     """
     return Task(
-        description=f"""
+        name="architecture",
+        description=fill_template("""
         Com base no plano do projeto, defina a arquitetura técnica e decisões de design.
         
         Sua tarefa é:
@@ -59,19 +62,20 @@ def create_architecture_task(planning_context: str = "") -> Task:
         criar branches se necessário, e documentar a arquitetura.
         
         {planning_context}
-        """,
-        agent=create_tech_lead(),
+        """, planning_context=planning_context),
+        agent=agent or get_agent("tech_lead"),
         expected_output="Documento de arquitetura técnica com decisões de design, estrutura do projeto, "
                        "tecnologias escolhidas e padrões de desenvolvimento"
     )
 
 
-def create_implementation_task(architecture_context: str = "") -> Task:
+def create_implementation_task(architecture_context: str = "", agent: Optional[Agent] = None) -> Task:
     """
     Creates the implementation task for the Developer.
     """
     return Task(
-        description=f"""
+        name="implementation",
+        description=fill_template("""
         Implemente as funcionalidades definidas seguindo a arquitetura e padrões estabelecidos.
         
         Sua tarefa é:
@@ -86,19 +90,20 @@ def create_implementation_task(architecture_context: str = "") -> Task:
         abrir pull requests e colaborar com a equipe.
         
         {architecture_context}
-        """,
-        agent=create_developer(),
+        """, architecture_context=architecture_context),
+        agent=agent or get_agent("developer"),
         expected_output="Código implementado de alta qualidade com commits bem documentados "
                        "e pull requests criados conforme necessário"
     )
 
 
-def create_testing_task(implementation_context: str = "") -> Task:
+def create_testing_task(implementation_context: str = "", agent: Optional[Agent] = None) -> Task:
     """
     Creates the testing and quality assurance task for the Tester.
     """
     return Task(
-        description=f"""
+        name="testing",
+        description=fill_template("""
         Realize testes abrangentes e garanta a qualidade do código implementado.
         
         Sua tarefa é:
@@ -114,20 +119,60 @@ def create_testing_task(implementation_context: str = "") -> Task:
         criar issues para bugs, e documentar resultados dos testes.
         
         {implementation_context}
-        """,
-        agent=create_tester(),
+        """, implementation_context=implementation_context),
+        agent=agent or get_agent("tester"),
         expected_output="Relatório de testes com casos de teste executados, bugs identificados "
                        "e validação de que todos os requisitos foram atendidos corretamente"
     )
 
 
-def create_all_tasks(project_description: str) -> list[Task]:
+# Earlier task outputs each task consumes, used by the parallel scheduler (scheduler.py).
+# Test planning only needs the architecture, so it runs alongside the implementation.
+TASK_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "planning": (),
+    "architecture": ("planning",),
+    "implementation": ("architecture",),
+    "testing": ("architecture",),
+}
+
+
+def sequential_dependencies() -> dict[str, tuple[str, ...]]:
+    """
+    Dependencies for running the tasks one after another: each task consumes its
+    declared inputs plus the output of the task right before it.
+    """
+    dependencies = {}
+    previous = None
+    for name, inputs in TASK_DEPENDENCIES.items():
+        extra = (previous,) if previous and previous not in inputs else ()
+        dependencies[name] = tuple(inputs) + extra
+        previous = name
+    return dependencies
+
+
+def create_named_tasks(project_description: str, agents: Optional[dict[str, Agent]] = None) -> dict[str, Task]:
+    """
+    Creates all tasks for the IT squad workflow keyed by task name, in workflow order.
+    
+    Args:
+        project_description: Description of the project to be executed
+        agents: Agents keyed by role; defaults to the shared registry agents
+    """
+    agents = agents or {}
+    return {
+        "planning": create_planning_task(project_description, agent=agents.get("project_manager")),
+        "architecture": create_architecture_task(agent=agents.get("tech_lead")),
+        "implementation": create_implementation_task(agent=agents.get("developer")),
+        "testing": create_testing_task(agent=agents.get("tester"))
+    }
+
+
+def create_all_tasks(project_description: str, agents: Optional[dict[str, Agent]] = None) -> list[Task]:
     """
     Creates all tasks for the IT squad workflow.
+    
+    Args:
+        project_description: Description of the project to be executed
+        agents: Agents keyed by role; defaults to the shared registry agents
     """
-    return [
-        create_planning_task(project_description),
-        create_architecture_task(),
-        create_implementation_task(),
-        create_testing_task()
-    ]
+    return list(create_named_tasks(project_description, agents).values())
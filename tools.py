@@ -1,36 +1,473 @@
 """
 GitHub Tools Integration
 This module provides GitHub tools using LangChain for the IT squad.
+
+Nothing here talks to GitHub at import time. `github_tools` holds lightweight
+CrewAI proxy tools with the same names, descriptions and argument schemas as
+the LangChain GitHubToolkit (CrewAI only accepts its own BaseTool); the underlying GitHubAPIWrapper (network round-trips
+and auth check) is built on the first tool call, or earlier in a background
+thread via `warm_github_tools()`.
+
+Providers are pooled per credentials and repository (a bounded LRU, see
+GITHUB_PROVIDER_POOL_SIZE), and providers with the same credentials share one
+authenticated PyGithub client and its HTTP session. The tools resolve their
+provider on every call: inside `repository_scope("owner/repo")` (which
+run_it_squad(repository=...) enters for the whole run) the same agents and
+tools operate on that repository, so crews for different repositories can run
+concurrently in one process.
+
+Results larger than a per-tool token budget (TOOL_RESULT_MAX_TOKENS) are not
+passed to the agent whole: it receives the first page, a summary for files and
+diffs, and a handle for the "Fetch more GitHub results" tool, so the context
+of a turn stays bounded however large the repository is.
 """
 
+import contextvars
 import os
-from dotenv import load_dotenv
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+from pydantic import BaseModel, Field
+from crewai.tools import BaseTool
+from github_cache import create_cache_middleware, get_default_cache
+from ratelimit import tool_rate_limit_middleware
+from tracing import tool_tracing_middleware
+from streaming import tool_streaming_middleware
+from checkpoint import side_effects_middleware
+from settings import load_settings
+from prompts import compact
+from context import count_tokens
+
+# Load environment variables (once per process, see settings.py)
+load_settings()
+
+# Middleware applied to every GitHub tool call, outermost first.
+# Signature: middleware(provider, mode, instructions, call_next) -> str
+ToolMiddleware = Callable[["GitHubToolProvider", str, str, Callable[[str, str], str]], str]
+_tool_middleware: list[ToolMiddleware] = []
+
+# Repository targeted by the GitHub tools in the current run or task (None = the tool's own)
+current_repository: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_repository", default=None)
+
+
+@contextmanager
+def repository_scope(repository: Optional[str]) -> Iterator[None]:
+    """
+    Route the GitHub tool calls made inside the block to a repository ("owner/repo").
+    """
+    token = current_repository.set(repository)
+    try:
+        yield
+    finally:
+        current_repository.reset(token)
+
+
+def add_tool_middleware(middleware: ToolMiddleware) -> None:
+    """
+    Register a middleware around every GitHub tool call (caching, tracing, ...).
+    """
+    if middleware not in _tool_middleware:
+        _tool_middleware.append(middleware)
+
+
+class GitHubToolProvider:
+    """
+    Lazily builds and caches the GitHubAPIWrapper for one token/repository pair.
+    """
+
+    def __init__(self, token: Optional[str] = None, repository: Optional[str] = None):
+        self.token = token
+        self.repository = repository
+        self._wrapper = None
+        self._lock = threading.Lock()
+        self._warm_thread: Optional[threading.Thread] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self._wrapper is not None
+
+    def resolve(self) -> Any:
+        """
+        Build the GitHub API wrapper on first use and return it.
+        """
+        if self._wrapper is None:
+            with self._lock:
+                if self._wrapper is None:
+                    self._wrapper = self._build_wrapper()
+        return self._wrapper
+
+    @property
+    def credentials(self) -> tuple:
+        return (self.token, os.getenv("GITHUB_APP_ID"), os.getenv("GITHUB_APP_PRIVATE_KEY"))
+
+    def _build_wrapper(self) -> Any:
+        """
+        Build the wrapper, reusing the authenticated client of another repository when possible.
+        """
+        from langchain_community.utilities.github import GitHubAPIWrapper
+
+        client = _clients.get(self.credentials)
+        if client is None or not self.repository:
+            kwargs = {}
+            if self.repository:
+                kwargs["github_repository"] = self.repository
+            # Validation authenticates the app installation and looks up the repository
+            wrapper = GitHubAPIWrapper(**kwargs)
+            _clients.setdefault(self.credentials, wrapper.github)
+            return wrapper
+        repo = client.get_repo(self.repository)
+        return GitHubAPIWrapper.model_construct(
+            github=client,
+            github_repo_instance=repo,
+            github_repository=self.repository,
+            github_app_id=os.getenv("GITHUB_APP_ID"),
+            github_app_private_key=os.getenv("GITHUB_APP_PRIVATE_KEY"),
+            active_branch=os.getenv("ACTIVE_BRANCH") or repo.default_branch,
+            github_base_branch=os.getenv("GITHUB_BASE_BRANCH") or repo.default_branch,
+        )
+
+    def warm(self) -> threading.Thread:
+        """
+        Resolve the wrapper in a background thread. Safe to call repeatedly.
+        """
+        with self._lock:
+            if self._warm_thread is None:
+                self._warm_thread = threading.Thread(
+                    target=self._warm, name="github-tools-warmup", daemon=True
+                )
+                self._warm_thread.start()
+            return self._warm_thread
+
+    def _warm(self) -> None:
+        try:
+            self.resolve()
+        except Exception as e:
+            print(f"⚠️  Could not initialize GitHub tools: {e}")
+
+    def invoke(self, mode: str, instructions: str = "") -> str:
+        """
+        Run a GitHub toolkit operation through the registered middleware.
+        """
+        def call(index: int, mode: str, instructions: str) -> str:
+            if index == len(_tool_middleware):
+                return self._run(mode, instructions)
+            return _tool_middleware[index](
+                self, mode, instructions, lambda m, i: call(index + 1, m, i)
+            )
+
+        return call(0, mode, instructions)
+
+    def _run(self, mode: str, instructions: str) -> str:
+        try:
+            wrapper = self.resolve()
+        except Exception as e:
+            return f"GitHub tools are not available: {e}"
+        return wrapper.run(mode, instructions)
+
+
+class LazyGitHubTool(BaseTool):
+    """
+    Proxy for a GitHubToolkit tool that delegates to its provider when called.
+    """
+
+    mode: str
+    provider: Any = None
+
+    def _run(self, instructions: Optional[str] = "", **kwargs: Any) -> str:
+        kwargs.pop("run_manager", None)
+        if not instructions and kwargs:
+            # Toolkit schemas have a single field that carries the instructions
+            instructions = next(iter(kwargs.values()))
+        if not instructions or instructions == "{}":
+            instructions = ""
+        provider = self.provider
+        repository = current_repository.get()
+        if repository and repository != provider.repository:
+            provider = get_github_provider(provider.token, repository)
+        return provider.invoke(self.mode, str(instructions))
+
+
+# Token budget of a tool result in the agent's context; larger results are paged.
+# File and diff reads get a larger page and a summary of what was left out.
+DEFAULT_RESULT_BUDGET = 1500
+RESULT_BUDGETS = {
+    "read_file": 2500,
+    "get_pull_request": 2500,
+    "list_pull_request_files": 2500,
+}
+SUMMARIZED_MODES = set(RESULT_BUDGETS)
+
+_OUTLINE_LINE = re.compile(
+    r"^\s*(def |class |async def |function |export |public |private |interface |#{1,6} |diff --git |\+\+\+ |@@ )"
+)
+
+
+def result_budget(mode: str) -> int:
+    """
+    Token budget of a tool's results (TOOL_RESULT_MAX_TOKENS scales the defaults, 0 disables paging).
+    """
+    scale = float(os.getenv("TOOL_RESULT_MAX_TOKENS", DEFAULT_RESULT_BUDGET)) / DEFAULT_RESULT_BUDGET
+    return int(RESULT_BUDGETS.get(mode, DEFAULT_RESULT_BUDGET) * scale)
+
+
+def _take_lines(lines: list[str], start: int, budget: int) -> int:
+    """
+    Index after the last line from `start` that fits the token budget (at least one line).
+    """
+    used = 0
+    end = start
+    while end < len(lines):
+        used += count_tokens(lines[end]) + 1
+        if used > budget and end > start:
+            break
+        end += 1
+    return end
+
+
+class ResultPager:
+    """
+    Keeps oversized tool results and serves them a page at a time.
+
+    Results are held in a bounded LRU, so memory stays flat however many large
+    results a run produces; a handle that was evicted asks the agent to call the
+    tool again.
+    """
 
-# Load environment variables
-load_dotenv()
+    def __init__(self, max_results: int = 64):
+        self.max_results = max_results
+        self._results: "OrderedDict[str, tuple[str, list[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _store(self, mode: str, lines: list[str]) -> str:
+        result_id = uuid.uuid4().hex[:10]
+        with self._lock:
+            self._results[result_id] = (mode, lines)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result_id
+
+    def _page(self, result_id: str, mode: str, lines: list[str], start: int, budget: int) -> str:
+        # Hard cap for single lines longer than the whole budget (minified files, long diffs)
+        end = _take_lines(lines, start, budget)
+        page = "\n".join(lines[start:end])
+        if count_tokens(page) > budget:
+            page = page[:budget * 4] + " [...]"
+        if end >= len(lines):
+            return f"{page}\n[End of result: lines {start + 1}-{end} of {len(lines)}]"
+        return (f"{page}\n[Showing lines {start + 1}-{end} of {len(lines)}. "
+                f"To read more, use the 'Fetch more GitHub results' tool with handle \"{result_id}@{end}\"]")
+
+    def shape(self, mode: str, result: str, budget: int) -> str:
+        """
+        Return the result as is if it fits the budget, otherwise its first page and a handle.
+        """
+        if budget <= 0 or count_tokens(result) <= budget:
+            return result
+        lines = result.splitlines()
+        summary = ""
+        if mode in SUMMARIZED_MODES:
+            outline = [line.strip() for line in lines if _OUTLINE_LINE.match(line)]
+            summary = f"[{len(lines)} lines, {len(result)} characters in total"
+            if outline:
+                shown = outline[:40]
+                summary += "; outline:\n" + "\n".join(shown)
+                if len(outline) > len(shown):
+                    summary += f"\n... {len(outline) - len(shown)} more"
+            summary += "]\n"
+            summary = summary[:budget * 2]
+        result_id = self._store(mode, lines)
+        page_budget = max(budget // 4, budget - count_tokens(summary))
+        return summary + self._page(result_id, mode, lines, 0, page_budget)
+
+    def fetch(self, handle: str) -> str:
+        """
+        Next page of a stored result, from a handle returned with the previous page.
+        """
+        result_id, _, offset = handle.strip().strip('"').partition("@")
+        with self._lock:
+            stored = self._results.get(result_id)
+            if stored is not None:
+                self._results.move_to_end(result_id)
+        if stored is None:
+            return f"Unknown or expired handle {handle!r}; call the original tool again."
+        mode, lines = stored
+        try:
+            start = int(offset or 0)
+        except ValueError:
+            return f"Invalid handle {handle!r}"
+        if start >= len(lines):
+            return "[End of result]"
+        return self._page(result_id, mode, lines, start, result_budget(mode))
+
+
+result_pager = ResultPager()
+
+
+def result_shaping_middleware(provider, mode: str, instructions: str, call_next) -> str:
+    """
+    Middleware that bounds every tool result to its token budget (see ResultPager).
+    """
+    return result_pager.shape(mode, call_next(mode, instructions), result_budget(mode))
+
+
+class FetchMoreSchema(BaseModel):
+    handle: str = Field(..., description="Handle shown at the end of a paged GitHub result, e.g. \"3f2a9c1b0d@120\"")
+
+
+class FetchMoreTool(BaseTool):
+    """
+    Reads the next page of a GitHub result that was too large for one response.
+    """
+
+    name: str = "Fetch more GitHub results"
+    description: str = ("Returns the next page of a GitHub tool result that was cut to fit the context. "
+                        "Use the handle shown at the end of the previous page.")
+    args_schema: type[BaseModel] = FetchMoreSchema
+    pager: Any = None
+
+    def _run(self, handle: str = "", **kwargs: Any) -> str:
+        return (self.pager or result_pager).fetch(handle)
+
+
+# Providers by token/repository, least recently used first
+_providers: "OrderedDict[tuple, GitHubToolProvider]" = OrderedDict()
+_providers_lock = threading.Lock()
+# Authenticated PyGithub clients by credentials, shared by the providers of every repository
+_clients: dict[tuple, Any] = {}
+_tool_specs: Optional[list[dict]] = None
+
+
+def get_github_provider(token: Optional[str] = None, repository: Optional[str] = None) -> GitHubToolProvider:
+    """
+    Get the pooled provider for a token/repository pair (defaults from the environment).
+
+    The pool keeps the GITHUB_PROVIDER_POOL_SIZE most recently used providers
+    (default 32); an evicted provider is rebuilt on its next use from the
+    shared client, which costs one repository lookup.
+    """
+    token = token or os.getenv("GITHUB_TOKEN")
+    repository = repository or os.getenv("GITHUB_REPOSITORY")
+    key = (token, repository)
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            provider = GitHubToolProvider(token, repository)
+            _providers[key] = provider
+            max_size = int(os.getenv("GITHUB_PROVIDER_POOL_SIZE", "32"))
+            while len(_providers) > max(1, max_size):
+                _providers.popitem(last=False)
+        else:
+            _providers.move_to_end(key)
+        return provider
+
+
+def _load_tool_specs() -> list[dict]:
+    """
+    Read tool names, descriptions and schemas from GitHubToolkit without a connection.
+    """
+    global _tool_specs
+    if _tool_specs is None:
+        from langchain_community.agent_toolkits.github.toolkit import GitHubToolkit
+        from langchain_community.utilities.github import GitHubAPIWrapper
+
+        # model_construct skips validation, which is where the wrapper connects to GitHub
+        placeholder = GitHubAPIWrapper.model_construct()
+        toolkit = GitHubToolkit.from_github_api_wrapper(placeholder)
+        _tool_specs = [
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "mode": tool.mode,
+                "args_schema": tool.args_schema,
+            }
+            for tool in toolkit.get_tools()
+        ]
+    return _tool_specs
+
+
+def toolkit_descriptions() -> dict[str, str]:
+    """
+    GitHub tool descriptions by name as GitHubToolkit writes them, before compaction.
+    """
+    return {spec["name"]: spec["description"] for spec in _load_tool_specs()}
+
+
+def get_github_tools(provider: Optional[GitHubToolProvider] = None) -> list[BaseTool]:
+    """
+    Build lazy GitHub tools bound to a provider (the default one if omitted).
+    """
+    provider = provider or get_github_provider()
+    tools = []
+    for spec in _load_tool_specs():
+        spec = {key: value for key, value in spec.items() if value is not None}
+        spec["description"] = compact(spec["description"])
+        tools.append(LazyGitHubTool(provider=provider, **spec))
+    tools.append(FetchMoreTool())
+    return tools
+
+
+def warm_github_tools() -> Optional[threading.Thread]:
+    """
+    Start resolving the default GitHub provider in the background, if configured.
+    """
+    if not github_tools:
+        return None
+    return get_github_provider().warm()
+
+
+# Record latency and result size of every call made during a traced run (see tracing.py)
+add_tool_middleware(tool_tracing_middleware)
+
+# Report tool calls and results to stream_it_squad consumers (see streaming.py)
+add_tool_middleware(tool_streaming_middleware)
+
+# Record write operations with the task's checkpoint (see checkpoint.py)
+add_tool_middleware(side_effects_middleware)
+
+# Page results larger than their token budget (see ResultPager); inside tracing so spans
+# count what actually reaches the agent, outside the cache so full results are cached
+add_tool_middleware(result_shaping_middleware)
+
+# Cache read-only tool calls (see github_cache.py); disabled with GITHUB_CACHE_TTL=0
+github_cache = get_default_cache()
+if github_cache is not None:
+    add_tool_middleware(create_cache_middleware(github_cache))
+
+# Share the GitHub request budget and retry rate-limited calls across concurrent crews (see ratelimit.py)
+add_tool_middleware(tool_rate_limit_middleware)
 
 # Initialize github_tools as an empty list by default
 github_tools = []
 
 try:
-    from langchain_community.agent_toolkits.github.toolkit import GitHubToolkit
-    from langchain_community.utilities.github import GitHubAPIWrapper
-    
-    # Try to initialize GitHub API wrapper if credentials are available
     if os.getenv("GITHUB_TOKEN"):
-        # Create GitHub toolkit with various tools
-        github = GitHubAPIWrapper()
-        github_toolkit = GitHubToolkit.from_github_api_wrapper(github)
-        github_tools = github_toolkit.get_tools()
-        print(f"✓ GitHub tools initialized successfully with {len(github_tools)} tools")
+        github_tools = get_github_tools()
+        print(f"✓ GitHub tools registered ({len(github_tools)} tools, connecting on first use)")
     else:
         print("⚠️  GitHub token not found. GitHub tools will not be available.")
         print("   Add GITHUB_TOKEN to your .env file to enable GitHub integration.")
-        
+
 except Exception as e:
     print(f"⚠️  Could not initialize GitHub tools: {e}")
     print("   The squad will work without GitHub integration.")
     print("   To enable GitHub tools, ensure proper configuration in .env file.")
 
 # Export the tools for use by agents
-__all__ = ['github_tools']
+__all__ = [
+    'github_tools',
+    'github_cache',
+    'get_github_tools',
+    'get_github_provider',
+    'current_repository',
+    'repository_scope',
+    'warm_github_tools',
+    'add_tool_middleware',
+    'GitHubToolProvider',
+    'LazyGitHubTool',
+    'FetchMoreTool',
+    'ResultPager',
+    'result_pager',
+]
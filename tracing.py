@@ -0,0 +1,281 @@
+"""
+Tracing
+This module records token and latency data for every agent LLM call and GitHub tool call.
+
+Each call becomes a span tagged with the agent role and the task being run,
+with wall time, prompt/completion tokens (counted with the tokenizer), an
+estimated cost, retries, rate-limit waits and cache hits. Spans are kept per
+run, optionally appended to a JSONL file in an OpenTelemetry-like shape, and
+summarized in a table at the end of run_it_squad so the hot steps stand out.
+
+Inner middleware (caches, rate limiters) report what happened during a call
+with annotate(), e.g. annotate(cache_hit=True).
+
+Configuration (environment):
+- TRACE_PATH: JSONL file that receives every span (default: no export)
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterator, Optional
+from context import count_tokens
+
+# USD per 1K tokens (prompt, completion); longest matching model prefix wins
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4": (0.03, 0.06),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+current_tracer: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar("current_tracer", default=None)
+current_task: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_task", default=None)
+current_role: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_role", default=None)
+_current_annotations: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("current_annotations", default=None)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimated USD cost of a completion, or 0.0 for unknown models.
+    """
+    model = model.split("/")[-1]
+    matches = [prefix for prefix in MODEL_PRICES if model.startswith(prefix)]
+    if not matches:
+        return 0.0
+    prompt_price, completion_price = MODEL_PRICES[max(matches, key=len)]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+def annotate(**fields: Any) -> None:
+    """
+    Attach data to the span of the call in progress (no-op outside a traced call).
+
+    Numeric values accumulate, so repeated annotate(retries=1) counts retries.
+    """
+    annotations = _current_annotations.get()
+    if annotations is None:
+        return
+    for key, value in fields.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and key in annotations:
+            annotations[key] += value
+        else:
+            annotations[key] = value
+
+
+@contextmanager
+def task_scope(name: str, role: Optional[str] = None) -> Iterator[None]:
+    """
+    Tag every call made inside the block with a task name and the role running it.
+    """
+    task_token = current_task.set(name)
+    role_token = current_role.set(role)
+    try:
+        yield
+    finally:
+        current_role.reset(role_token)
+        current_task.reset(task_token)
+
+
+@dataclass
+class Span:
+    kind: str
+    name: str
+    role: Optional[str]
+    task: Optional[str]
+    start: float
+    duration_s: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    retries: int = 0
+    wait_s: float = 0.0
+    cache_hit: bool = False
+    error: Optional[str] = None
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+
+
+class Tracer:
+    """
+    Collects the spans of one run and exports them to an optional JSONL file.
+    """
+
+    def __init__(self, export_path: Optional[str] = None, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.export_path = export_path if export_path is not None else os.getenv("TRACE_PATH")
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+            if self.export_path:
+                with open(self.export_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(self._to_otel(span), ensure_ascii=False) + "\n")
+
+    def _to_otel(self, span: Span) -> dict:
+        attributes = {
+            key: value for key, value in asdict(span).items()
+            if key not in ("name", "start", "duration_s", "span_id") and value is not None
+        }
+        return {
+            "trace_id": self.trace_id,
+            "span_id": span.span_id,
+            "name": f"{span.kind}:{span.name}",
+            "start_time_unix_nano": int(span.start * 1e9),
+            "end_time_unix_nano": int((span.start + span.duration_s) * 1e9),
+            "status": "ERROR" if span.error else "OK",
+            "attributes": attributes,
+        }
+
+    def summary(self) -> list[dict]:
+        """
+        Aggregate spans per (kind, role, task), slowest first.
+        """
+        groups: dict[tuple, dict] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            key = (span.kind, span.role or "-", span.task or "-")
+            group = groups.setdefault(key, {
+                "kind": key[0], "role": key[1], "task": key[2], "calls": 0, "seconds": 0.0,
+                "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0,
+                "retries": 0, "cache_hits": 0, "errors": 0,
+            })
+            group["calls"] += 1
+            group["seconds"] += span.duration_s
+            group["prompt_tokens"] += span.prompt_tokens
+            group["completion_tokens"] += span.completion_tokens
+            group["cost_usd"] += span.cost_usd
+            group["retries"] += span.retries
+            group["cache_hits"] += int(span.cache_hit)
+            group["errors"] += int(span.error is not None)
+        return sorted(groups.values(), key=lambda group: group["seconds"], reverse=True)
+
+    def format_summary(self) -> str:
+        """
+        Printable table of the summary.
+        """
+        header = (f"{'Tipo':<6}{'Agente':<17}{'Tarefa':<16}{'Chamadas':>9}{'Tempo(s)':>10}"
+                  f"{'Prompt':>9}{'Resposta':>9}{'Custo($)':>10}{'Retries':>8}{'Cache':>7}")
+        rows = [header, "-" * len(header)]
+        total_seconds = total_cost = 0.0
+        for group in self.summary():
+            rows.append(
+                f"{group['kind']:<6}{group['role'][:16]:<17}{group['task'][:15]:<16}{group['calls']:>9}"
+                f"{group['seconds']:>10.2f}{group['prompt_tokens']:>9}{group['completion_tokens']:>9}"
+                f"{group['cost_usd']:>10.4f}{group['retries']:>8}{group['cache_hits']:>7}"
+            )
+            total_seconds += group["seconds"]
+            total_cost += group["cost_usd"]
+        rows.append(f"Total: {total_seconds:.2f}s em chamadas, custo estimado ${total_cost:.4f}")
+        return "\n".join(rows)
+
+
+@contextmanager
+def trace_run(tracer: Optional[Tracer] = None) -> Iterator[Tracer]:
+    """
+    Make a tracer current for every call made inside the block (including worker threads
+    started with a copied context, such as the task scheduler's).
+    """
+    tracer = tracer or Tracer()
+    token = current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        current_tracer.reset(token)
+
+
+@contextmanager
+def _traced_call() -> Iterator[dict]:
+    annotations = {"retries": 0, "wait_s": 0.0, "cache_hit": False}
+    token = _current_annotations.set(annotations)
+    try:
+        yield annotations
+    finally:
+        _current_annotations.reset(token)
+
+
+def llm_tracing_middleware(llm, messages: list[dict], call_next) -> str:
+    """
+    agents.py LLM middleware that records a span per completion.
+    """
+    tracer = current_tracer.get()
+    if tracer is None:
+        return call_next(messages)
+
+    start = time.time()
+    started = time.perf_counter()
+    error = None
+    result = ""
+    with _traced_call() as annotations:
+        try:
+            result = call_next(messages)
+            return result
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            prompt_tokens = sum(count_tokens(str(message.get("content", ""))) for message in messages)
+            completion_tokens = count_tokens(result or "")
+            cache_hit = bool(annotations["cache_hit"])
+            tracer.record(Span(
+                kind="llm",
+                name=llm.model,
+                role=getattr(llm, "role", None),
+                task=current_task.get(),
+                start=start,
+                duration_s=time.perf_counter() - started,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                cost_usd=0.0 if cache_hit else estimate_cost(llm.model, prompt_tokens, completion_tokens),
+                retries=annotations["retries"],
+                wait_s=annotations["wait_s"],
+                cache_hit=cache_hit,
+                error=error,
+            ))
+
+
+def tool_tracing_middleware(provider, mode: str, instructions: str, call_next) -> str:
+    """
+    tools.py middleware that records a span per GitHub tool call.
+
+    The result's token count is recorded as completion tokens, since it is what
+    lands in the agent's context.
+    """
+    tracer = current_tracer.get()
+    if tracer is None:
+        return call_next(mode, instructions)
+
+    start = time.time()
+    started = time.perf_counter()
+    error = None
+    result = ""
+    with _traced_call() as annotations:
+        try:
+            result = call_next(mode, instructions)
+            return result
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            tracer.record(Span(
+                kind="tool",
+                name=mode,
+                role=current_role.get(),
+                task=current_task.get(),
+                start=start,
+                duration_s=time.perf_counter() - started,
+                prompt_tokens=count_tokens(instructions),
+                completion_tokens=count_tokens(result or ""),
+                retries=annotations["retries"],
+                wait_s=annotations["wait_s"],
+                cache_hit=bool(annotations["cache_hit"]),
+                error=error,
+            ))
@@ -1,119 +1,363 @@
 """
 Setup Verification Script
 Run this script to verify your environment is properly configured.
+
+The checks run concurrently, each with its own timeout, and report how long
+they took. Nothing heavy is imported: packages and project modules are located
+with importlib.util.find_spec (project modules are also compiled, which catches
+syntax errors), so GitHub and the agent framework are never initialized.
+
+OpenAI and GitHub credentials are validated with one cheap request each
+(GET /models and GET /rate_limit; the latter does not count against the GitHub
+quota). Successful validations are cached for a while, keyed by a hash of the
+credential, so repeated runs and container readiness probes do not call the
+APIs again. An API that cannot be reached fails its check, like one that
+answers with an error. Only in offline mode (--offline or PREFLIGHT_OFFLINE)
+are the credentials checked by a local stub that validates their format.
+
+Usage:
+    python verify_setup.py
+    python verify_setup.py --probe      # one line and the exit code, for readiness probes
+    python verify_setup.py --offline --no-cache
+
+Configuration (environment):
+- PREFLIGHT_TIMEOUT: seconds allowed per check (default 5; 0.5 with --probe)
+- PREFLIGHT_CACHE_TTL: seconds a successful credential check is reused (default 300, 0 disables)
+- PREFLIGHT_CACHE_PATH: cache file (default .cache/preflight.json)
+- PREFLIGHT_OFFLINE: "on" to always use the local stub
 """
 
+import argparse
+import hashlib
+import importlib.util
+import json
 import os
+import re
 import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+REQUIRED_PACKAGES = [
+    ('crewai', 'CrewAI'),
+    ('langchain', 'LangChain'),
+    ('langchain_openai', 'LangChain OpenAI'),
+    ('langchain_community', 'LangChain Community'),
+    ('dotenv', 'Python Dotenv')
+]
+
+PROJECT_MODULES = ['tools', 'agents', 'tasks', 'crew', 'main', 'examples']
+
+GITHUB_API_URL = "https://api.github.com"
+
+
+@dataclass
+class CheckResult:
+    name: str
+    ok: bool
+    lines: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+    cached: bool = False
+
+
+class PreflightCache:
+    """
+    Successful credential checks, kept in a JSON file for ttl seconds.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        if ttl > 0 and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def get(self, key: str) -> Optional[list[str]]:
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry["at"] > self.ttl:
+            return None
+        return entry["lines"]
+
+    def put(self, key: str, lines: list[str]) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            now = time.time()
+            self._entries = {k: v for k, v in self._entries.items() if now - v["at"] <= self.ttl}
+            self._entries[key] = {"at": now, "lines": lines}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(temporary, self.path)
+
+
+def _http_fetch(url: str, headers: dict, timeout: float) -> tuple[int, dict]:
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        return e.code, {}
+
+
+def _stub_fetch(url: str, headers: dict, timeout: float) -> tuple[int, dict]:
+    """
+    Local stand-in for the OpenAI and GitHub APIs: accepts well-formed credentials.
+    """
+    credential = headers.get("Authorization", "").split(" ", 1)[-1]
+    if url.endswith("/rate_limit"):
+        valid = re.fullmatch(r"(gh[pousr]_\w{20,}|github_pat_\w{20,}|[0-9a-f]{40})", credential)
+        return (200, {"resources": {"core": {"remaining": 5000, "limit": 5000}}}) if valid else (401, {})
+    valid = re.fullmatch(r"sk-[\w-]{20,}", credential)
+    return (200, {"data": []}) if valid else (401, {})
 
 
 def check_dependencies():
     """Check if all required packages are installed."""
-    print("🔍 Checking dependencies...")
-    
-    required_packages = [
-        ('crewai', 'CrewAI'),
-        ('langchain', 'LangChain'),
-        ('langchain_openai', 'LangChain OpenAI'),
-        ('langchain_community', 'LangChain Community'),
-        ('dotenv', 'Python Dotenv')
-    ]
-    
+    lines = []
     missing = []
-    for package, name in required_packages:
-        try:
-            __import__(package)
-            print(f"  ✓ {name}")
-        except ImportError:
-            print(f"  ✗ {name} - NOT INSTALLED")
+    for package, name in REQUIRED_PACKAGES:
+        if importlib.util.find_spec(package) is not None:
+            lines.append(f"  ✓ {name}")
+        else:
+            lines.append(f"  ✗ {name} - NOT INSTALLED")
             missing.append(name)
-    
+
     if missing:
-        print(f"\n❌ Missing packages: {', '.join(missing)}")
-        print("   Run: pip install -r requirements.txt")
-        return False
-    
-    print("✅ All dependencies installed\n")
-    return True
+        lines.append(f"❌ Missing packages: {', '.join(missing)}")
+        lines.append("   Run: pip install -r requirements.txt")
+        return False, lines
+
+    lines.append("✅ All dependencies installed")
+    return True, lines
 
 
 def check_environment():
     """Check if environment variables are configured."""
-    print("🔍 Checking environment configuration...")
-    
-    from dotenv import load_dotenv
-    load_dotenv()
-    
+    from settings import missing_required
+
+    lines = []
+    status = not missing_required()
     openai_key = os.getenv("OPENAI_API_KEY")
     github_token = os.getenv("GITHUB_TOKEN")
-    
+
     if not openai_key:
-        print("  ✗ OPENAI_API_KEY - NOT SET")
-        print("     Required for running the squad")
-        status = False
+        lines.append("  ✗ OPENAI_API_KEY - NOT SET")
+        lines.append("     Required for running the squad")
     else:
-        print(f"  ✓ OPENAI_API_KEY - Set ({openai_key[:10]}...)")
-        status = True
-    
+        lines.append(f"  ✓ OPENAI_API_KEY - Set ({openai_key[:10]}...)")
+
     if not github_token:
-        print("  ⚠️  GITHUB_TOKEN - NOT SET")
-        print("     Optional: GitHub tools will not be available")
+        lines.append("  ⚠️  GITHUB_TOKEN - NOT SET")
+        lines.append("     Optional: GitHub tools will not be available")
     else:
-        print(f"  ✓ GITHUB_TOKEN - Set ({github_token[:10]}...)")
-    
+        lines.append(f"  ✓ GITHUB_TOKEN - Set ({github_token[:10]}...)")
+
     if not status:
-        print("\n❌ Missing required environment variables")
-        print("   Create a .env file with your credentials")
-        print("   See .env.example for template")
-        return False
-    
-    print("✅ Environment configured\n")
-    return True
+        lines.append("❌ Missing required environment variables")
+        lines.append("   Create a .env file with your credentials")
+        lines.append("   See .env.example for template")
+        return False, lines
+
+    lines.append("✅ Environment configured")
+    return True, lines
 
 
 def check_modules():
-    """Check if all project modules can be imported."""
-    print("🔍 Checking project modules...")
-    
-    modules = ['tools', 'agents', 'tasks', 'crew', 'main', 'examples']
-    
-    for module in modules:
+    """Check that all project modules are present and compile, without importing them."""
+    lines = []
+    for module in PROJECT_MODULES:
+        spec = importlib.util.find_spec(module)
+        if spec is None or not spec.origin:
+            lines.append(f"  ✗ {module}.py - NOT FOUND")
+            return False, lines
+        try:
+            with open(spec.origin, encoding="utf-8") as f:
+                compile(f.read(), spec.origin, "exec")
+        except SyntaxError as e:
+            lines.append(f"  ✗ {module}.py - ERROR: line {e.lineno}: {e.msg}")
+            return False, lines
+        lines.append(f"  ✓ {module}.py")
+
+    lines.append("✅ All modules valid")
+    return True, lines
+
+
+def _check_credential(
+    label: str,
+    url: str,
+    credential: str,
+    describe: Callable[[dict], str],
+    cache: PreflightCache,
+    offline: bool,
+    timeout: float
+):
+    """
+    Validate a credential with one request, reusing a recent success from the cache.
+    """
+    key = hashlib.sha256(f"{url}\0{credential}".encode("utf-8")).hexdigest()[:24]
+    cached = cache.get(key)
+    if cached is not None:
+        return True, cached, True
+
+    headers = {"Authorization": f"Bearer {credential}", "User-Agent": "it-squad-verify-setup"}
+    fetch, note = (_stub_fetch, " (offline, format only)") if offline else (_http_fetch, "")
+    try:
+        status, payload = fetch(url, headers, timeout)
+    except (urllib.error.URLError, OSError) as e:
+        reason = getattr(e, "reason", None) or e
+        return False, [f"  ✗ {label} - API unreachable ({reason}); use --offline to check the format only"], False
+
+    if status != 200:
+        return False, [f"  ✗ {label} - rejected (HTTP {status})"], False
+    lines = [f"  ✓ {label} - valid{note}{describe(payload)}"]
+    if not offline:
+        cache.put(key, lines)
+    return True, lines, False
+
+
+def check_openai(cache: PreflightCache, offline: bool, timeout: float):
+    """Validate OPENAI_API_KEY with GET /models."""
+    from settings import load_settings
+    load_settings()
+    key = os.getenv("OPENAI_API_KEY")
+    if not key:
+        return True, ["  – OpenAI - skipped (OPENAI_API_KEY not set)"], False
+    base_url = (os.getenv("OPENAI_API_BASE") or "https://api.openai.com/v1").rstrip("/")
+    return _check_credential(
+        "OpenAI", f"{base_url}/models", key, lambda payload: "", cache, offline, timeout
+    )
+
+
+def check_github(cache: PreflightCache, offline: bool, timeout: float):
+    """Validate GITHUB_TOKEN with GET /rate_limit (free of quota)."""
+    from settings import load_settings
+    load_settings()
+    token = os.getenv("GITHUB_TOKEN")
+    if not token:
+        return True, ["  – GitHub - skipped (GITHUB_TOKEN not set)"], False
+
+    def describe(payload: dict) -> str:
+        core = payload.get("resources", {}).get("core", {})
+        return f", {core['remaining']}/{core['limit']} requests left" if "remaining" in core else ""
+
+    return _check_credential(
+        "GitHub", f"{GITHUB_API_URL}/rate_limit", token, describe, cache, offline, timeout
+    )
+
+
+def run_checks(checks: list[tuple[str, Callable]], timeout: float) -> list[CheckResult]:
+    """
+    Run checks concurrently, each allowed `timeout` seconds; results are in the order of `checks`.
+
+    A check returns (ok, lines) or (ok, lines, cached); an exception or a
+    timeout fails it.
+    """
+    def timed(name: str, check: Callable) -> CheckResult:
+        started = time.perf_counter()
         try:
-            __import__(module)
-            print(f"  ✓ {module}.py")
+            ok, lines, *cached = check()
+            result = CheckResult(name, ok, lines, cached=bool(cached and cached[0]))
         except Exception as e:
-            print(f"  ✗ {module}.py - ERROR: {str(e)[:50]}...")
-            return False
-    
-    print("✅ All modules valid\n")
-    return True
+            result = CheckResult(name, False, [f"❌ Error checking {name}: {e}"])
+        result.seconds = time.perf_counter() - started
+        return result
+
+    # Daemon threads: a check that hangs past its timeout must not hold up the exit
+    results: dict[int, CheckResult] = {}
+    threads = []
+    for index, (name, check) in enumerate(checks):
+        thread = threading.Thread(
+            target=lambda index=index, name=name, check=check: results.__setitem__(index, timed(name, check)),
+            name=f"preflight-{index}",
+            daemon=True,
+        )
+        thread.start()
+        threads.append(thread)
+    deadline = time.perf_counter() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.perf_counter()))
+    return [
+        results.get(index) or CheckResult(name, False, [f"  ✗ Timed out after {timeout:.1f}s"], timeout)
+        for index, (name, _) in enumerate(checks)
+    ]
 
 
-def main():
+def build_checks(offline: bool, timeout: float, cache: PreflightCache) -> list[tuple[str, Callable]]:
+    return [
+        ("Dependencies", check_dependencies),
+        ("Environment", check_environment),
+        ("Project Modules", check_modules),
+        ("OpenAI Credentials", lambda: check_openai(cache, offline, timeout)),
+        ("GitHub Credentials", lambda: check_github(cache, offline, timeout)),
+    ]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Verify the IT squad setup.")
+    parser.add_argument("--probe", action="store_true",
+                        help="print one line and exit 0/1, with a short timeout (readiness probes)")
+    parser.add_argument("--offline", action="store_true",
+                        help="check credentials with the local stub instead of calling the APIs")
+    parser.add_argument("--no-cache", action="store_true", help="ignore cached credential checks")
+    parser.add_argument("--timeout", type=float, help="seconds allowed per check (default: PREFLIGHT_TIMEOUT)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Run all checks."""
+    args = parse_args(argv)
+    started = time.perf_counter()
+    # The PREFLIGHT_* settings may come from .env
+    try:
+        from settings import load_settings
+        load_settings()
+    except ImportError:
+        # python-dotenv missing: reported by the dependency check
+        pass
+    default_timeout = "0.5" if args.probe else "5"
+    timeout = args.timeout if args.timeout is not None else float(os.getenv("PREFLIGHT_TIMEOUT", default_timeout))
+    offline = args.offline or os.getenv("PREFLIGHT_OFFLINE", "off").lower() in ("on", "1", "true")
+    cache = PreflightCache(
+        os.getenv("PREFLIGHT_CACHE_PATH", os.path.join(".cache", "preflight.json")),
+        0 if args.no_cache else float(os.getenv("PREFLIGHT_CACHE_TTL", "300")),
+    )
+
+    results = run_checks(build_checks(offline, timeout, cache), timeout)
+    elapsed = time.perf_counter() - started
+    success = all(result.ok for result in results)
+
+    if args.probe:
+        failed = [result.name for result in results if not result.ok]
+        print(f"ready ({elapsed:.2f}s)" if success else f"not ready: {', '.join(failed)} ({elapsed:.2f}s)")
+        return success
+
     print("=" * 70)
     print("🚀 AI Squad - Setup Verification")
     print("=" * 70)
     print()
-    
-    checks = [
-        ("Dependencies", check_dependencies),
-        ("Environment", check_environment),
-        ("Project Modules", check_modules)
-    ]
-    
-    results = []
-    for name, check_func in checks:
-        try:
-            result = check_func()
-            results.append(result)
-        except Exception as e:
-            print(f"❌ Error checking {name}: {e}\n")
-            results.append(False)
-    
+
+    for result in results:
+        timing = "cached" if result.cached else f"{result.seconds * 1000:.0f} ms"
+        print(f"🔍 {result.name} ({timing})")
+        for line in result.lines:
+            print(line)
+        print()
+
     print("=" * 70)
-    if all(results):
-        print("✅ All checks passed! You're ready to run the squad.")
+    if success:
+        print(f"✅ All checks passed in {elapsed:.2f}s! You're ready to run the squad.")
         print("\nRun: python main.py")
     else:
         print("⚠️  Some checks failed. Please fix the issues above.")
@@ -121,8 +365,8 @@ def main():
         print("  - README.md (English)")
         print("  - GUIA_PT.md (Portuguese)")
     print("=" * 70)
-    
-    return all(results)
+
+    return success
 
 
 if __name__ == "__main__":
@@ -0,0 +1,225 @@
+"""
+Worker Processes
+This module runs batch projects on a pool of worker processes.
+
+Crews running on threads of one process share the GIL, so the CPU side of a
+run (prompt templating, output parsing, JSON of tool results, verbose logging)
+stalls every other run in the process. WorkerPool spreads the runs over
+processes instead: each worker runs batch.run_project on a few threads and
+keeps its agents (agents.checkout_squad), LLM clients and GitHub clients
+(tools.py) warm from one job to the next.
+
+Each worker is connected to the parent by a pipe. The parent keeps the
+pending jobs and hands the next one to whichever worker has a free thread, so
+a worker that drew short projects keeps pulling work while another is busy
+with a long one, and no lock is shared between processes. Jobs are numbered
+in the order they are handed out, and finished records (batch.serialize_result)
+come back over the same pipe with their number, so projects sharing an id are
+still told apart. If a worker process
+dies, the jobs it was running are reported as errors and a replacement
+process is started.
+
+Rate limits are enforced per process, so the OpenAI and GitHub limits of the
+parent are split evenly across the workers.
+
+Configuration (environment):
+- WORKER_PROCESSES: worker processes when none are given, e.g. --processes 0 (default: CPU count)
+- WORKER_START_METHOD: multiprocessing start method (default: the platform's;
+  "fork" on Linux, which reuses the modules the parent already imported)
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Iterable, Iterator, Optional
+
+
+def default_processes() -> int:
+    return int(os.getenv("WORKER_PROCESSES", "0")) or os.cpu_count() or 1
+
+
+def _worker_main(connection, threads: int, parallel: bool, max_task_concurrency: int, rate_limits: dict) -> None:
+    """
+    Entry point of a worker process: run the (number, project) jobs received on the pipe until a None arrives.
+    """
+    from batch import run_project
+    from ratelimit import configure_rate_limit
+
+    for provider, requests_per_minute in rate_limits.items():
+        configure_rate_limit(provider, requests_per_minute)
+    jobs: queue.Queue = queue.Queue()
+    send_lock = threading.Lock()
+
+    def work() -> None:
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            number, item = job
+            record = run_project(item, parallel, max_task_concurrency)
+            with send_lock:
+                connection.send((number, record))
+
+    workers = [threading.Thread(target=work, name=f"squad-worker-{i}") for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            job = None
+        if job is None:
+            break
+        jobs.put(job)
+    for _ in workers:
+        jobs.put(None)
+    for worker in workers:
+        worker.join()
+    connection.close()
+
+
+class _Worker:
+    def __init__(self, process, connection):
+        self.process = process
+        self.connection = connection
+        # Project ids of the jobs in progress, by job number
+        self.running: dict[int, str] = {}
+
+
+class WorkerPool:
+    """
+    Long-lived worker processes running batch projects handed out by the parent.
+
+    Args:
+        processes: Number of worker processes (default WORKER_PROCESSES or the CPU count)
+        threads: Crews running at the same time in each process
+        parallel: Use the dependency-graph scheduler inside each crew
+        max_task_concurrency: Task concurrency inside each crew in parallel mode
+        start_method: multiprocessing start method (default WORKER_START_METHOD)
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        threads: int = 1,
+        parallel: bool = False,
+        max_task_concurrency: int = 2,
+        start_method: Optional[str] = None
+    ):
+        self.processes = processes or default_processes()
+        self.threads = max(1, threads)
+        self.parallel = parallel
+        self.max_task_concurrency = max_task_concurrency
+        self._context = multiprocessing.get_context(start_method or os.getenv("WORKER_START_METHOD") or None)
+        self._workers: list[_Worker] = []
+        self._rate_limits = self._split_rate_limits()
+
+    def _split_rate_limits(self) -> dict:
+        from ratelimit import get_rate_limiter
+
+        limits = {}
+        for provider in ("openai", "github"):
+            limiter = get_rate_limiter(provider)
+            limits[provider] = limiter.rate * 60 / self.processes if limiter is not None else 0
+        return limits
+
+    def _start_worker(self) -> None:
+        parent_end, child_end = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_end, self.threads, self.parallel, self.max_task_concurrency, self._rate_limits),
+            name="squad-worker",
+            daemon=True,
+        )
+        process.start()
+        child_end.close()
+        self._workers.append(_Worker(process, parent_end))
+
+    def start(self) -> "WorkerPool":
+        while len(self._workers) < self.processes:
+            self._start_worker()
+        return self
+
+    def run(self, items: Iterable[dict]) -> Iterator[dict]:
+        """
+        Run projects on the workers and yield their records as they finish.
+
+        Args:
+            items: Projects with "id" and "project_description"
+        """
+        pending = deque(enumerate(items))
+        while pending or any(worker.running for worker in self._workers):
+            for worker in self._workers:
+                while pending and len(worker.running) < self.threads:
+                    number, item = pending.popleft()
+                    worker.running[number] = item["id"]
+                    worker.connection.send((number, item))
+            by_handle = {}
+            for worker in self._workers:
+                by_handle[worker.connection] = worker
+                by_handle[worker.process.sentinel] = worker
+            for handle in wait(list(by_handle)):
+                worker = by_handle[handle]
+                if worker not in self._workers:
+                    continue
+                yield from self._receive(worker)
+                if handle == worker.process.sentinel or not worker.process.is_alive():
+                    yield from self._replace(worker)
+
+    def _receive(self, worker: _Worker) -> Iterator[dict]:
+        try:
+            while worker.connection.poll():
+                number, record = worker.connection.recv()
+                worker.running.pop(number, None)
+                yield record
+        except (EOFError, OSError):
+            pass
+
+    def _replace(self, worker: _Worker) -> Iterator[dict]:
+        worker.process.join()
+        worker.connection.close()
+        self._workers.remove(worker)
+        for job_id in worker.running.values():
+            yield {
+                "id": job_id,
+                "status": "error",
+                "error": f"Worker process exited with code {worker.process.exitcode}",
+                "duration_seconds": 0.0,
+            }
+        self._start_worker()
+
+    def close(self) -> None:
+        """
+        Stop the workers once their running jobs are done.
+        """
+        for worker in self._workers:
+            try:
+                worker.connection.send(None)
+            except OSError:
+                pass
+        for worker in self._workers:
+            worker.process.join()
+            worker.connection.close()
+        self._workers.clear()
+
+    def terminate(self) -> None:
+        """
+        Stop the workers right away, abandoning their jobs.
+        """
+        for worker in self._workers:
+            worker.process.terminate()
+            worker.process.join()
+            worker.connection.close()
+        self._workers.clear()
+
+    def __enter__(self) -> "WorkerPool":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()